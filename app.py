@@ -1,4 +1,4 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, send_file, Response, stream_with_context
+from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, send_file, Response, stream_with_context, session
 from flask_login import login_user, logout_user, login_required, current_user
 # ✅ Engine: database, auth, user model
 from engine import db, init_app, register_user, login_user_helper, logout_user_helper
@@ -9,19 +9,29 @@ from llm_engine import query_llama3, SYSTEM_PROMPT #is_product_query
 # ✅ Chat history
 # from engine2 import get_chat_history, save_chat_history, clear_chat_history
 # ✅ Caching (if you’re using it)
-from cache_config import init_cache
+from cache_config import init_cache, search_cache
 # ✅ Async and threading
 import os
 import secrets
 from datetime import timedelta
 from io import BytesIO
 import re
+import json
 from dotenv import load_dotenv
 from flask_cors import CORS
-from scrap_local import scrape_products_by_category
+from scrap_local import scrape_products_by_category, iter_products_by_category
 from scrap_global import try_single_site_scrape
-from product_extraction import extract_and_store_products
-from llm_engine import summarize_products
+from product_extraction import extract_and_store_products, suggest_index, category_store
+from llm_engine import summarize_products, stream_summary, get_client
+import intent_engine
+from startup import boot_stage, start_warmup
+import provider_health
+from provider_budget import provider_budget
+from response_store import response_store
+from search_refresh import search_refresher
+from product_catalog import product_catalog
+from product import blocks_to_dicts, products_to_dicts
+from ranking import rank_blocks
 
 load_dotenv()
 
@@ -32,13 +42,23 @@ app.secret_key = os.getenv("SECRET_KEY") or secrets.token_hex(16)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)
-# ✅ Init cache and database
-init_cache(app)
-init_app(app)
-# ✅ Create tables if not exist
-with app.app_context():
-    from engine import db
-    db.create_all()
+# ✅ Init cache and database (init_app creates the tables once)
+with boot_stage("init_cache"):
+    init_cache(app)
+with boot_stage("init_app"):
+    init_app(app)
+    product_catalog.init_app(app)
+
+# 🔥 Heavy subsystems load in the background so the first requests don't pay for them
+start_warmup([
+    ("groq client", get_client),
+    ("categories", category_store.load),
+    ("suggest index", suggest_index.load),
+    ("noun phrases", intent_engine.warm_up)
+])
+
+# ♻️ Re-scrape hot queries before their cached results expire (SEARCH_REFRESH=0 disables)
+search_refresher.start()
 
 
 @app.route('/')
@@ -145,6 +165,13 @@ def remove_non_latin1(text):
 
 app.config['JSON_AS_ASCII'] = False  # ✅ Ensure UTF-8 encoding
 
+def chat_session_id():
+    """Stable id for the browser session, used to keep each user's chat state separate."""
+    if "chat_sid" not in session:
+        session["chat_sid"] = secrets.token_hex(16)
+    return session["chat_sid"]
+
+
 @app.route("/chat", methods=["POST"])
 def chat():
     try:
@@ -155,9 +182,11 @@ def chat():
 
         print(f"📩 User Input: {user_input}")  # Debugging
 
+        reply = query_llama3(user_input, chat_session_id())
+
         # ✅ Streaming Response Generator
         def generate():
-            for chunk in query_llama3(user_input):
+            for chunk in reply:
                 yield chunk
 
         return Response(generate(), content_type="text/plain")
@@ -177,9 +206,11 @@ def voice():
         if not user_input:
             return "No message provided", 400
 
+        reply = query_llama3(user_input, chat_session_id())
+
         # ✅ Streaming Response Generator for Voice
         def generate():
-            for chunk in query_llama3(user_input):
+            for chunk in reply:
                 yield chunk
 
         return Response(generate(), content_type="text/plain")
@@ -189,6 +220,84 @@ def voice():
         return "Internal server error", 500
     
 
+@app.route("/suggest", methods=["GET"])
+def suggest():
+    """Top-k autocomplete completions for the search bar."""
+    query = request.args.get("q", "").strip()
+    try:
+        k = max(1, min(int(request.args.get("k", 8)), 20))
+    except ValueError:
+        k = 8
+
+    return jsonify({"query": query, "suggestions": suggest_index.suggest(query, k)}), 200
+
+
+@app.route("/internal/budget", methods=["GET"])
+def internal_budget():
+    """Proxy budget usage, provider health, cache and refresh stats (X-Internal-Token, or localhost when unset)."""
+    token = os.getenv("INTERNAL_API_TOKEN")
+    if token:
+        if not secrets.compare_digest(request.headers.get("X-Internal-Token", ""), token):
+            return jsonify({"error": "Forbidden"}), 403
+    elif request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({"error": "Forbidden"}), 403
+
+    return jsonify({
+        "budget": provider_budget.snapshot(),
+        "health": provider_health.snapshot(),
+        "response_store": response_store.stats(),
+        "search_cache": search_cache.stats(),
+        "search_refresh": search_refresher.stats(),
+        "catalog": product_catalog.stats()
+    }), 200
+
+
+def results_message(results, bot_type):
+    return {
+        "text": f"Here are the top products from {', '.join(r['site'].capitalize() for r in results)} displayed on your screen.",
+        "speak": bot_type == "voice"
+    }
+
+
+def ndjson_event(event, **fields):
+    return json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n"
+
+
+def stream_search(query, category, selected_site, bot_type):
+    """
+    NDJSON event stream for /search-products: one "site" event per site as soon
+    as its extractor finishes, one "ranked" event with the merged cross-site
+    top-K, "summary_delta" events as the summary is generated, then the full
+    "summary" event, then "done".
+    """
+    results = []
+    try:
+        if category == "specific-sites":
+            blocks = try_single_site_scrape(query, selected_site)
+        else:
+            blocks = iter_products_by_category(query, category)
+
+        for block in blocks:
+            results.append(block)
+            # Product records become the frontend's dicts (with their source site) only here
+            yield ndjson_event("site", **blocks_to_dicts([block])[0])
+
+        if results:
+            yield ndjson_event("ranked", data=products_to_dicts(rank_blocks(query, results)))
+
+        parts = []
+        for text in stream_summary(query, results):
+            parts.append(text)
+            yield ndjson_event("summary_delta", text=text)
+        yield ndjson_event("summary", message=results_message(results, bot_type), summary="".join(parts).strip())
+
+    except Exception as e:
+        print("Scraping error:", e)
+        yield ndjson_event("error", error=str(e))
+
+    yield ndjson_event("done", sites=[r["site"] for r in results])
+
+
 @app.route("/search-products", methods=["POST"])
 def search_products():
     data = request.json
@@ -201,37 +310,40 @@ def search_products():
 
     bot_type = data.get("bot_type", "chat")
 
+    # ✅ Streaming mode (NDJSON) for clients that ask for it; plain JSON otherwise
+    wants_stream = bool(data.get("stream")) or "application/x-ndjson" in request.headers.get("Accept", "")
+
     print(f"[ROUTE] 🔔 Incoming search request: {data}")
 
     if not query:
         return jsonify({"error": "Missing product query"}), 400
 
+    if category == "specific-sites" and not selected_site:
+        return jsonify({"error": "No specific site selected"}), 400
+
+    if wants_stream:
+        return Response(
+            stream_with_context(stream_search(query, category, selected_site, bot_type)),
+            content_type="application/x-ndjson"
+        )
+
     try:
         # ✅ 1. Handle single-site scraping
         if category == "specific-sites":
-            if not selected_site:
-                return jsonify({"error": "No specific site selected"}), 400
             results = try_single_site_scrape(query, selected_site)
         else:
             # ✅ 2. Multi-site or ratings-based scraping
             results, _ = scrape_products_by_category(query, category)
 
-        # ✅ 3. Add source tag to each product
-        for site_result in results:
-            site_name = site_result["site"]
-            for product in site_result["data"]:
-                product["source"] = site_name
-
-        # ✅ 4. Generate summary from LLM
+        # ✅ 3. Generate summary from LLM
         summary = summarize_products(query, results)
 
-        # ✅ 5. Construct and return response
+        # ✅ 4. Construct and return response (Product records serialized with their source site);
+        # "ranked" is every site's candidates merged into one top-K list
         response = {
-            "products": results or [],
-            "message": {
-                "text": f"Here are the top products from {', '.join(r['site'].capitalize() for r in results)} displayed on your screen.",
-                "speak": bot_type == "voice"
-            },
+            "products": blocks_to_dicts(results),
+            "ranked": products_to_dicts(rank_blocks(query, results)),
+            "message": results_message(results, bot_type),
             "summary": summary
         }
 
@@ -0,0 +1,128 @@
+# benchmarks/bench_classifier.py
+"""
+Microbenchmark for query_classifier.classify against the nested keyword
+scans it replaced (determine_product_type, detect_category and
+detect_fetch_trigger). The old PRODUCT_KEYWORDS, CATEGORY_KEYWORDS and
+FETCH_PHRASES tables are read from the baseline commit with `git show`, so
+the comparison is against the code that was replaced, not today's table.
+The corpus is benchmarks/fixtures/queries.txt plus every product name in
+static/data/categories.json.
+
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --iterations 50 --show-diff
+    python benchmarks/bench_classifier.py --rev <commit>  # baseline revision (default: the root commit)
+
+Reports µs per query for both paths (classify with its lru_cache cleared
+before every pass) and lists the texts the two disagree on.
+"""
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import query_classifier  # noqa: E402
+from query_classifier import classify  # noqa: E402
+
+# Old table → the baseline module that defined it
+LEGACY_TABLES = {
+    "PRODUCT_KEYWORDS": "scrap_local.py",
+    "CATEGORY_KEYWORDS": "product_extraction.py",
+    "FETCH_PHRASES": "trigger.py"
+}
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+
+def load_legacy_tables(rev):
+    """The old keyword dicts, read as literals from their modules at rev."""
+    tables = {}
+    for name, module in LEGACY_TABLES.items():
+        tree = ast.parse(git("show", f"{rev}:{module}"))
+        tables[name] = next(
+            ast.literal_eval(node.value) for node in tree.body
+            if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == name for t in node.targets)
+        )
+    return tables
+
+
+def make_legacy_classify(tables):
+    """The substring scans the three old call sites performed, over the frozen tables."""
+    routing = list(tables["PRODUCT_KEYWORDS"].items())
+    catalog_rows = list(tables["CATEGORY_KEYWORDS"].items())
+    fetch_rows = list(tables["FETCH_PHRASES"].items())
+
+    def legacy_classify(text):
+        q = text.lower()
+        category = next((c for c, kws in routing if any(k in q for k in kws)), "general")
+        catalog = next((c for c, kws in catalog_rows if any(k in q for k in kws)), "general")
+        fetch_site = next((s for s, phrases in fetch_rows if any(p in q.strip() for p in phrases)), None)
+        return category, catalog, fetch_site
+
+    return legacy_classify
+
+
+def load_corpus():
+    with open(os.path.join(BENCH_DIR, "fixtures", "queries.txt"), encoding="utf-8") as f:
+        corpus = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    with open(os.path.join(ROOT, "static", "data", "categories.json"), encoding="utf-8") as f:
+        corpus.extend(name for names in json.load(f).values() for name in names)
+    return corpus
+
+
+def time_per_query(fn, corpus, iterations, before_pass=None):
+    best = float("inf")
+    for _ in range(iterations):
+        if before_pass:
+            before_pass()
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword classifier microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20, help="timed passes over the corpus (best is reported)")
+    parser.add_argument("--show-diff", action="store_true", help="print every text the old and new classifiers disagree on")
+    parser.add_argument("--rev", help="baseline revision with the old tables (default: the repository's root commit)")
+    args = parser.parse_args()
+
+    rev = args.rev or git("rev-list", "--max-parents=0", "HEAD").split()[0]
+    legacy_classify = make_legacy_classify(load_legacy_tables(rev))
+    corpus = load_corpus()
+    legacy_us = time_per_query(legacy_classify, corpus, args.iterations)
+    cold_us = time_per_query(classify, corpus, args.iterations, before_pass=classify.cache_clear)
+    warm_us = time_per_query(classify, corpus, args.iterations)
+
+    print(f"corpus: {len(corpus)} texts, {len(query_classifier.KEYWORD_OWNERS)} keywords")
+    print(f"{'legacy substring scans':<26} {legacy_us:>8.2f} µs/query")
+    print(f"{'classify (uncached)':<26} {cold_us:>8.2f} µs/query")
+    print(f"{'classify (cached)':<26} {warm_us:>8.2f} µs/query")
+
+    diffs = []
+    for text in corpus:
+        result = classify(text)
+        new = (result.category, result.catalog_category, result.fetch_site)
+        old = legacy_classify(text)
+        if new != old:
+            diffs.append((text, old, new))
+
+    print(f"disagreements with the substring scans at {rev[:10]}: {len(diffs)}")
+    if args.show_diff:
+        for text, old, new in diffs:
+            print(f"  {text[:60]!r}\n      old={old}\n      new={new}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
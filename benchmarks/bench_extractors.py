@@ -0,0 +1,255 @@
+# benchmarks/bench_extractors.py
+"""
+Offline extractor benchmark and regression check.
+
+Runs every extractor (each parsing backend in extraction_engine.BACKENDS
+for HTML sites, both detail modes for Amazon) against the pages in
+benchmarks/fixtures and reports pages/sec, cost per product card and peak
+Python heap per page. Amazon and Slot fetch their own data, so their
+recorded payloads are replayed through a temporary replay-only response
+store: nothing touches the network.
+
+Correctness is checked two ways:
+  * against fixtures/expected, the frozen outputs of the baseline
+    extract_*_data functions (record_baseline.py): every product the old
+    extractor returned must still be extracted with identical fields.
+    Order isn't compared, since results are now ranked by ranking.py.
+  * across backends: bs4 and lxml must return the same products in the same order.
+
+    python benchmarks/bench_extractors.py                  # benchmark + correctness check
+    python benchmarks/bench_extractors.py --min-pages-per-sec 100 --site jumia
+
+Exits non-zero when an extractor loses or alters a baseline product, the
+backends disagree, or a site falls below the throughput gate.
+"""
+import os
+import io
+import sys
+import json
+import time
+import atexit
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+EXPECTED_DIR = os.path.join(FIXTURES_DIR, "expected")
+
+# Must be set before the project modules create their response store
+STORE_DIR = tempfile.mkdtemp(prefix="ace_bench_store_")
+atexit.register(shutil.rmtree, STORE_DIR, ignore_errors=True)
+os.environ["RESPONSE_STORE_MODE"] = "replay"
+os.environ["RESPONSE_STORE_DIR"] = STORE_DIR
+sys.path.insert(0, ROOT)
+
+import http_client  # noqa: E402
+import scrap_local  # noqa: E402
+import extraction_engine  # noqa: E402
+from response_store import ResponseStore  # noqa: E402
+
+
+class Recorded:
+    """A recorded 200 response, in the shape ResponseStore.save expects."""
+
+    status_code = 200
+
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+
+
+# Fields compared with the baseline product of the same URL; lazy Amazon mode builds
+# products from the search payload, so only which ASINs it keeps is comparable
+BASELINE_FIELDS = ("name", "price", "rating", "url", "image")
+LAZY_FIELDS = ("url",)
+
+
+class Case:
+    def __init__(self, key, site, engine, fn, query, cards, page=None, fields=BASELINE_FIELDS):
+        self.key = key  # Manifest entry: the site, or a variant page of it
+        self.site = site
+        self.engine = engine
+        self.fn = fn
+        self.query = query
+        self.cards = cards
+        self.page = page
+        self.fields = fields
+
+    def run(self):
+        return self.fn(self.page, self.query)
+
+
+def load_manifest():
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def seed_store(manifest):
+    """Record the Amazon structured payloads and the Slot ZenRows page into the replay store."""
+    store = ResponseStore(root=STORE_DIR, mode="readwrite")
+
+    if "amazon" in manifest:
+        entry = manifest["amazon"]
+        search_url = "https://api.scraperapi.com/structured/amazon/search"
+        store.save("scraperapi", search_url, {"query": entry["query"]}, Recorded(search_url, read_fixture(entry["search"])))
+        products = json.loads(read_fixture(entry["products"]))
+        for asin, payload in products.items():
+            url = scrap_local.AMAZON_PRODUCT_ENDPOINT
+            store.save("scraperapi", url, {"asin": asin}, Recorded(url, json.dumps(payload)))
+
+    if "slot" in manifest:
+        entry = manifest["slot"]
+        params = {
+            "url": scrap_local.search_url("slot", entry["query"]),
+            "js_render": "true",
+            "wait_for": ".products"
+        }
+        url = http_client.PROVIDER_URLS["zenrows"]
+        store.save("zenrows", url, params, Recorded(url, read_fixture(entry["page"])))
+
+
+def count_cards(site, html):
+    spec = extraction_engine.COMPILED_SPECS["lxml"][site]
+    return len(spec.backend.cards(html, spec.cards, spec.max_cards))
+
+
+def build_cases(manifest, only_sites=None):
+    sites = list(scrap_local.RATING_SITES) + list(scrap_local.NON_RATING_SITES)
+    for site in sites:
+        if site not in manifest:
+            print(f"[WARN] No fixture for {site}, skipping")
+    cases = []
+
+    # Variant entries ({"site": ...}) are extra pages for a site, e.g. queries the names don't contain
+    for key, entry in manifest.items():
+        site = entry.get("site", key)
+        if site not in sites or (only_sites and site not in only_sites):
+            continue
+
+        if site == "amazon":
+            asins = len(json.loads(read_fixture(entry["search"])).get("results", [])[:4])
+            for mode in ("full", "lazy"):
+                fn = lambda _, query, mode=mode: scrap_local.extract_amazon_data(None, query, detail_mode=mode)
+                fields = LAZY_FIELDS if mode == "lazy" else BASELINE_FIELDS
+                cases.append(Case(key, site, f"replay-{mode}", fn, entry["query"], asins, fields=fields))
+            continue
+
+        html = read_fixture(entry["page"])
+        cards = count_cards(site, html)
+        for engine in extraction_engine.BACKENDS:
+            fn = lambda page, query, site=site, engine=engine: extraction_engine.extract_site(site, page, query, engine=engine)
+            cases.append(Case(key, site, engine, fn, entry["query"], cards, page=html))
+
+        if site in scrap_local.SELF_FETCHING_SITES and key == site:
+            # Full fetch + parse path, served by the replay store
+            fn = lambda _, query, site=site: scrap_local.EXTRACTOR_MAP[site](None, query)
+            cases.append(Case(key, site, "replay", fn, entry["query"], cards))
+
+    return cases
+
+
+def measure(case, iterations):
+    with contextlib.redirect_stdout(io.StringIO()):
+        output = case.run()  # Warm-up (selector caches, store file cache)
+
+        tracemalloc.start()
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            case.run()
+        elapsed = time.perf_counter() - start
+
+    per_page = elapsed / iterations
+    return {
+        "output": output,
+        "pages_per_sec": 1 / per_page if per_page else float("inf"),
+        "us_per_card": per_page / case.cards * 1e6 if case.cards else 0.0,
+        "peak_kib": peak / 1024
+    }
+
+
+def load_expected(key):
+    try:
+        with open(os.path.join(EXPECTED_DIR, f"{key}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def baseline_diff(output, expected, fields):
+    """Problems with output against the baseline products (empty when every one is extracted unchanged)."""
+    by_url = {product.get("url"): product for product in output}
+    problems = []
+    for old in expected:
+        new = by_url.get(old.get("url"))
+        if new is None:
+            problems.append(f"missing {old.get('url')}")
+            continue
+        changed = [field for field in fields if new.get(field) != old.get(field)]
+        if changed:
+            problems.append(f"{old.get('url')}: " + ", ".join(f"{f} {old.get(f)!r} → {new.get(f)!r}" for f in changed))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline extractor benchmark")
+    parser.add_argument("--iterations", type=int, default=30, help="timed runs per site and engine")
+    parser.add_argument("--site", action="append", help="only benchmark these sites (repeatable)")
+    parser.add_argument("--min-pages-per-sec", type=float, default=0.0, help="fail if any case is slower than this")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    seed_store(manifest)
+    cases = build_cases(manifest, set(args.site) if args.site else None)
+
+    failures = []
+    reference = {}  # manifest key → (engine, output) of the first backend run, for the agreement check
+    print(f"{'case':<22} {'engine':<13} {'cards':>5} {'pages/s':>9} {'µs/card':>9} {'peak KiB':>9}  output")
+    for case in cases:
+        result = measure(case, args.iterations)
+        output = json.loads(json.dumps([product.to_dict() for product in result["output"]], default=str))
+
+        expected = load_expected(case.key)
+        problems = baseline_diff(output, expected, case.fields) if expected is not None else []
+        if case.engine in extraction_engine.BACKENDS:
+            engine, agreed = reference.setdefault(case.key, (case.engine, output))
+            if output != agreed:
+                problems.append(f"output differs from the {engine} backend")
+
+        if expected is None:
+            status = "NO BASELINE"
+            failures.append(f"{case.key}/{case.engine}: no baseline output (run benchmarks/record_baseline.py)")
+        elif problems:
+            status = "CHANGED"
+            failures.extend(f"{case.key}/{case.engine}: {problem}" for problem in problems)
+        else:
+            status = f"ok ({len(output)})"
+
+        if args.min_pages_per_sec and result["pages_per_sec"] < args.min_pages_per_sec:
+            failures.append(f"{case.key}/{case.engine}: {result['pages_per_sec']:.1f} pages/s below gate of {args.min_pages_per_sec}")
+
+        print(f"{case.key:<22} {case.engine:<13} {case.cards:>5} {result['pages_per_sec']:>9.1f} "
+              f"{result['us_per_card']:>9.1f} {result['peak_kib']:>9.1f}  {status}")
+
+    if failures:
+        print("\n[❌] Benchmark failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
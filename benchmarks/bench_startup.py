@@ -0,0 +1,133 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start report for the Flask app.
+
+Boots `import app` in a fresh interpreter with `-X importtime` and breaks
+the time down by package (self time of every module it imports) and by
+project module (cumulative time of each first-party import). It also lists
+the init stages recorded in startup.STARTUP_TIMINGS (cache, database, and
+background warm-up tasks from a second boot when --warmup is given).
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --top 25 --warmup
+    python benchmarks/bench_startup.py --max-import-ms 1500   # fail on regressions
+
+DATABASE_URL defaults to a throwaway SQLite file and groq_api to a dummy
+key, so the report runs without credentials.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+MARKER = "__STARTUP_TIMINGS__"
+
+CHILD = """
+import time, json
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+import startup
+if {warmup}:
+    for thread in __import__("threading").enumerate():
+        if thread.name == "warmup":
+            thread.join()
+print("{marker}" + json.dumps({{"import app": imported, **startup.STARTUP_TIMINGS}}))
+"""
+
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(ROOT) if name.endswith(".py")}
+
+
+def run_child(warmup):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='ace_boot_'), 'boot.db')}")
+    env.setdefault("groq_api", "dummy")
+    env["WARMUP"] = "1" if warmup else "0"
+
+    code = CHILD.format(warmup=bool(warmup), marker=MARKER)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"[❌] Booting the app failed (exit {proc.returncode})")
+
+    timings = {}
+    for line in proc.stdout.splitlines():
+        if line.startswith(MARKER):
+            timings = json.loads(line[len(MARKER):])
+    return proc.stderr, timings
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask app cold-start report")
+    parser.add_argument("--top", type=int, default=15, help="packages to list by self time")
+    parser.add_argument("--warmup", action="store_true", help="wait for the background warm-up and report its tasks")
+    parser.add_argument("--max-import-ms", type=float, default=0.0, help="fail if `import app` takes longer than this")
+    args = parser.parse_args()
+
+    # Imports made by the warm-up thread would interleave with the main thread's
+    # importtime tree, so the import breakdown always comes from a warm-up-free boot
+    stderr, timings = run_child(warmup=False)
+    if args.warmup:
+        _, timings = run_child(warmup=True)
+    rows = parse_importtime(stderr)
+    ours = project_modules()
+
+    by_package = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+
+    # Cumulative cost of each first-party module the first time it is imported
+    first_party = {}
+    for module, _, cumulative_us, _ in rows:
+        if module in ours and module not in first_party:
+            first_party[module] = cumulative_us
+
+    print(f"{'package (self time)':<32} {'ms':>8}")
+    for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        tag = " *" if package in ours else ""
+        print(f"{package + tag:<32} {us / 1000:>8.1f}")
+
+    print(f"\n{'project module (cumulative)':<32} {'ms':>8}")
+    for module, us in sorted(first_party.items(), key=lambda item: item[1], reverse=True):
+        print(f"{module:<32} {us / 1000:>8.1f}")
+
+    print(f"\n{'boot stage':<32} {'ms':>8}")
+    for stage, seconds in timings.items():
+        print(f"{stage:<32} {seconds * 1000:>8.1f}")
+
+    heavy = [name for name in ("langchain_community", "soundfile", "groq", "textblob", "nltk") if name in by_package]
+    print(f"\nloaded at import: {', '.join(heavy) if heavy else 'none of langchain_community/soundfile/groq/textblob/nltk'}")
+
+    import_ms = timings.get("import app", 0.0) * 1000
+    if args.max_import_ms and import_ms > args.max_import_ms:
+        print(f"[❌] import app took {import_ms:.0f} ms (gate {args.max_import_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# benchmarks/make_fixtures.py
+"""
+Regenerate the synthetic fixture pages used by bench_extractors.py.
+
+Pages mirror each marketplace's card markup (the selectors in
+extraction_engine.SITE_SPECS) with realistic noise: missing prices and
+images, accessories, unrelated brands, entities and page chrome. Recorded
+pages can replace any of them; keep the file names in manifest.json.
+After changing a page, re-record its baseline output with
+record_baseline.py --force.
+
+    python benchmarks/make_fixtures.py
+"""
+import os
+import json
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CARDS_PER_PAGE = 40
+
+SITES = {
+    "jumia": ("samsung phone", "Samsung", ["Galaxy A15 Phone 128GB", "Galaxy S24 Ultra Phone", "Phone Case Cover", "Galaxy Buds", "Phone Charger Cable", "Galaxy A05 Phone &amp; Pouch"]),
+    "konga": ("hp laptop", "HP", ["Pavilion 15 Laptop", "EliteBook 840 Laptop Core i5", "Laptop Bag", "Envy x360 Laptop", "Wireless Mouse"]),
+    "slot": ("iphone 13", "Apple", ["iPhone 13 128GB", "iPhone 13 Pro Max", "iPhone 12", "Screen Guard iPhone 13", "iPhone 13 Mini"]),
+    "kara": ("lg tv", "LG", ["43 Inch Smart TV", "55&quot; UHD TV", "TV Wall Bracket", "OLED TV 65", "Soundbar"]),
+    "ajebomarket": ("sneakers", "Nike", ["Sneakers White", "Canvas Sneakers", "Leather Loafers", "Sneakers Cleaner Kit", "Running Sneakers"]),
+    "topsuccess": ("blender", "Binatone", ["Blender 1.5L", "Silver Crest Blender", "Blender Jar", "Kenwood Blender", "Pressing Iron"]),
+    "jiji": ("infinix hot", "Infinix", ["Hot 40i 128GB", "Hot 30", "Tecno Spark 10", "Hot 12 Used", "Note 30"]),
+}
+OTHER_BRANDS = ["Tecno", "Oraimo", "Hisense", "Xiaomi", "Nokia", "Generic"]
+
+# Extra pages for a site (manifest key → site, query, brand, names): queries whose
+# matching products don't contain the query words as typed
+VARIANTS = {
+    "ajebomarket-apostrophe": ("ajebomarket", "women's", "Zara", ["Womens Leather Bag", "Womens Sneakers", "Mens Loafers", "Women's Wrap Dress", "Kids Sandals"]),
+}
+# Amazon's search ranks this ASIN for the query even though its title has neither query word
+AMAZON_OFF_TITLE = {2: "Apple AirPods Pro (2nd Generation)"}
+
+
+def noise(count):
+    return "".join(
+        f'<div class="promo-{i}"><span>Deal {i}</span><p>Flash sale &amp; free delivery on item {i}</p></div>'
+        for i in range(count)
+    )
+
+
+def naira():
+    return f"&#8358; {random.randint(10, 900)},{random.randint(0, 999):03d}"
+
+
+def card(site, i, brand, name):
+    full = f"{brand} {name}" if random.random() < .6 else f"{random.choice(OTHER_BRANDS)} {name}"
+    roll = random.random()
+    price = "" if roll < .07 else naira()
+    image = "" if .07 <= roll < .12 else f"https://cdn.example.com/{site}/{i}.jpg"
+    href = f"/product/{site}-{i}.html"
+
+    if site == "jumia":
+        width = random.choice([100, 96, 90, 84, 80, 70, 60])
+        stars = f'<div class="stars _s"><div class="in" style="width:{width}%"></div></div>' if random.random() < .85 else ""
+        link_class = "core" if random.random() < .9 else "alt"
+        return (f'<article class="prd _fb col c-prd"><a class="{link_class}" href="{href}" data-id="{i}">'
+                f'<div class="img-c"><img class="img" data-src="{image}" src="data:image/gif;base64,R0lG" alt=""></div>'
+                f'<div class="info"><h3 class="name"> {full} </h3><div class="prc">{price}</div>{stars}</div></a></article>')
+    if site == "konga":
+        return (f'<article class="a2cf5_2S5q5"><div><a href="{href}"><img src="{image}"></a></div>'
+                f'<h3 class="af885_1iPzH">{full}</h3><span class="d7c0f_sJAqi"><span>{price}</span></span></article>')
+    if site == "slot":
+        return (f'<li class="product type-product"><a class="woocommerce-LoopProduct-link" href="https://slot.ng{href}">'
+                f'<img src="{image}"><h2 class="woocommerce-loop-product__title">{full}</h2></a>'
+                f'<span class="price"><span class="woocommerce-Price-amount amount"><bdi>{price}</bdi></span></span></li>')
+    if site == "kara":
+        return (f'<li class="item product"><a class="product-image" href="https://www.kara.com.ng{href}"><img src="{image}"></a>'
+                f'<h2 class="product-name"><a href="https://www.kara.com.ng{href}">{full}</a></h2>'
+                f'<div class="price-box"><span class="price">{price}</span></div></li>')
+    if site == "ajebomarket":
+        image = image.replace("https:", "")
+        return (f'<div class="card-wrapper product-card-wrapper"><div class="card"><img src="{image}">'
+                f'<h3 class="product__title"><a href="{href}">{full}</a></h3>'
+                f'<span class="price price--sale">{price}</span></div></div>')
+    if site == "topsuccess":
+        return (f'<div class="product-small col"><div class="box-image"><a class="woocommerce-LoopProduct-link" href="https://topsuccess.ng{href}">'
+                f'<img src="{image}"></a></div><p class="name product-title"><a href="https://topsuccess.ng{href}">{full}</a></p>'
+                f'<span class="woocommerce-Price-amount amount">{price}</span></div>')
+    if site == "jiji":
+        return (f'<div class="b-list-advert__item"><div class="b-list-advert__item-image"><img src="{image}"></div>'
+                f'<div class="b-list-advert__title"><a href="{href}">{full}</a></div>'
+                f'<div class="b-list-advert__price">{price}</div></div>')
+    raise ValueError(site)
+
+
+def page(site, query, brand, names):
+    cards = "\n".join(card(site, i, brand, random.choice(names)) for i in range(CARDS_PER_PAGE))
+    if site == "slot":
+        cards = f'<ul class="products columns-4">{cards}</ul>'
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{query} | {site}</title>'
+            f'<style>.a{{color:red}}</style><script>window.__STATE__={{"q":"{query}"}};</script></head>'
+            f'<body><header>{noise(60)}</header><main><section class="results">{cards}</section></main>'
+            f'<footer>{noise(80)}</footer></body></html>')
+
+
+def amazon_payloads(query):
+    search = {"results": []}
+    products = {}
+    for i in range(6):
+        asin = f"B0BENCH{i:03d}"
+        title = AMAZON_OFF_TITLE.get(i, f"Amazon Basics {query.title()} {i}")
+        search["results"].append({
+            "asin": asin,
+            "name": title,
+            "image": f"https://m.media-amazon.com/images/I/{asin}.jpg",
+            "price_string": f"${random.randint(20, 400)}.99",
+            "stars": random.choice([5.0, 4.7, 4.4, 4.1, 3.8])
+        })
+        products[asin] = {
+            "name": AMAZON_OFF_TITLE.get(i, f"Amazon Basics {query.title()} {i} (Renewed)"),
+            "pricing": f"${random.randint(20, 400)}.99",
+            "average_rating": random.choice([5.0, 4.6, 4.3, 4.0, 3.5]),
+            "images": [f"https://m.media-amazon.com/images/I/{asin}_hi.jpg"]
+        }
+    return search, products
+
+
+def main():
+    random.seed(7)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    manifest = {}
+
+    for site, (query, brand, names) in SITES.items():
+        filename = f"{site}.html"
+        with open(os.path.join(FIXTURES_DIR, filename), "w", encoding="utf-8") as f:
+            f.write(page(site, query, brand, names))
+        manifest[site] = {"query": query, "page": filename}
+
+    search, products = amazon_payloads("wireless earbuds")
+    with open(os.path.join(FIXTURES_DIR, "amazon_search.json"), "w", encoding="utf-8") as f:
+        json.dump(search, f, indent=2)
+    with open(os.path.join(FIXTURES_DIR, "amazon_products.json"), "w", encoding="utf-8") as f:
+        json.dump(products, f, indent=2)
+    manifest["amazon"] = {"query": "wireless earbuds", "search": "amazon_search.json", "products": "amazon_products.json"}
+
+    for key, (site, query, brand, names) in VARIANTS.items():
+        filename = f"{key}.html"
+        with open(os.path.join(FIXTURES_DIR, filename), "w", encoding="utf-8") as f:
+            f.write(page(site, query, brand, names))
+        manifest[key] = {"site": site, "query": query, "page": filename}
+
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[✅] Wrote {len(manifest)} fixtures to {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
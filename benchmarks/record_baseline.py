@@ -0,0 +1,130 @@
+# benchmarks/record_baseline.py
+"""
+Record the frozen reference outputs bench_extractors.py checks against.
+
+The extract_*_data functions are taken from scrap_local.py as it was at the
+baseline commit (before the spec-driven engine) and run over the fixture
+pages, so the regression check compares today's extractors with the code
+they replaced, not with themselves. The baseline's own network calls
+(requests.get for Amazon, the ZenRows client for Slot) are answered from
+the same fixture payloads bench_extractors replays.
+
+Outputs go to fixtures/expected/<manifest key>.json and are frozen: re-record only
+when a fixture page changes (--force), never to make a failing check pass.
+
+    python benchmarks/record_baseline.py                 # record missing outputs
+    python benchmarks/record_baseline.py --force         # re-record after changing fixtures
+    python benchmarks/record_baseline.py --rev <commit>  # baseline revision (default: the root commit)
+"""
+import os
+import io
+import ast
+import sys
+import json
+import argparse
+import subprocess
+import contextlib
+from bs4 import BeautifulSoup
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+EXPECTED_DIR = os.path.join(FIXTURES_DIR, "expected")
+
+BASELINE_FUNCTIONS = ("fuzzy_match", "fuzzy_partial_match")
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class Replayed:
+    """A 200 response carrying a fixture payload."""
+
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ReplayRequests:
+    """Stands in for the baseline's `requests` module: Amazon structured calls served from fixtures."""
+
+    def __init__(self, entry):
+        self.search = read_fixture(entry["search"])
+        self.products = json.loads(read_fixture(entry["products"]))
+
+    def get(self, url, params=None, **kwargs):
+        if url.endswith("/search"):
+            return Replayed(self.search)
+        return Replayed(json.dumps(self.products[params["asin"]]))
+
+
+def replay_zenrows(page):
+    class ReplayZenRowsClient:
+        def __init__(self, api_key):
+            pass
+
+        def get(self, url, params=None):
+            return Replayed(page)
+
+    return ReplayZenRowsClient
+
+
+def load_baseline(rev, namespace):
+    """Exec the baseline's extractor and matcher functions into namespace."""
+    source = git("show", f"{rev}:scrap_local.py")
+    tree = ast.parse(source)
+    wanted = [
+        node for node in tree.body
+        if isinstance(node, ast.FunctionDef)
+        and (node.name in BASELINE_FUNCTIONS or (node.name.startswith("extract_") and node.name.endswith("_data")))
+    ]
+    exec(compile(ast.Module(body=wanted, type_ignores=[]), f"{rev}:scrap_local.py", "exec"), namespace)
+    return namespace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record baseline extractor outputs for bench_extractors.py")
+    parser.add_argument("--rev", help="baseline revision (default: the repository's root commit)")
+    parser.add_argument("--force", action="store_true", help="overwrite existing reference outputs")
+    args = parser.parse_args()
+
+    rev = args.rev or git("rev-list", "--max-parents=0", "HEAD").split()[0]
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    os.makedirs(EXPECTED_DIR, exist_ok=True)
+    for key, entry in manifest.items():
+        site = entry.get("site", key)
+        path = os.path.join(EXPECTED_DIR, f"{key}.json")
+        if os.path.exists(path) and not args.force:
+            print(f"[SKIP] {key}: {os.path.relpath(path, ROOT)} is frozen (use --force after changing fixtures)")
+            continue
+
+        namespace = {"os": os, "BeautifulSoup": BeautifulSoup, "SCRAPER_API_KEY": None}
+        page = read_fixture(entry["page"]) if "page" in entry else None
+        if site == "amazon":
+            namespace["requests"] = ReplayRequests(entry)
+        if site == "slot":
+            namespace["ZenRowsClient"] = replay_zenrows(page)
+        load_baseline(rev, namespace)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            output = namespace[f"extract_{site}_data"](page, entry["query"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"[💾] {key}: {len(output)} products from {rev[:10]} → {os.path.relpath(path, ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,9 @@
 from flask_caching import Cache
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
 
 cache = Cache()
 
@@ -7,3 +12,145 @@ def init_cache(app):
     app.config["CACHE_TYPE"] = "simple"
     app.config["CACHE_DEFAULT_TIMEOUT"] = 1800
     cache.init_app(app)  # ✅ Bind cache to Flask app
+
+
+def _json_default(value):
+    # Product records are sized as the dicts they serialize to
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if to_dict is not None else str(value)
+
+
+def approximate_size(value):
+    """Rough in-memory footprint of a cached value, measured as its JSON length."""
+    try:
+        return len(json.dumps(value, default=_json_default))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class ResultCache:
+    """
+    Thread-safe in-process cache for scrape results with TTL expiry and
+    LRU eviction bounded by entry count and approximate byte size.
+    With stale_ttl, expired entries are kept that much longer so callers
+    can serve them (get_with_state) while a refresh runs.
+    """
+
+    def __init__(self, ttl=1800, max_entries=512, max_bytes=32 * 1024 * 1024, sizer=approximate_size, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self._entries = OrderedDict()  # key → (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Fresh value only; an expired entry is a miss."""
+        return self.get_with_state(key, default, allow_stale=False)[0]
+
+    def get_with_state(self, key, default=None, allow_stale=True):
+        """(value, stale): expired entries still inside stale_ttl come back with stale=True."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default, False
+
+            expires_at, _, value = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                if now >= expires_at + self.stale_ttl:
+                    self._remove(key)
+                    self.expirations += 1
+                    self.misses += 1
+                    return default, False
+                if not allow_stale:
+                    self.misses += 1
+                    return default, False
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return value, True
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, False
+
+    def peek(self, key):
+        """(value, seconds until expiry, negative once stale) without touching stats or LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            expires_at, _, value = entry
+            left = expires_at - time.monotonic()
+            if left <= -self.stale_ttl:
+                return None, None
+            return value, left
+
+    def set(self, key, value, ttl=None):
+        size = self.sizer(value)
+        if size > self.max_bytes:
+            return  # Too large to ever fit; don't flush the whole cache for it
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+# 🗃️ Shared scrape-result cache (category searches and single-site searches).
+# Expired results are served for SEARCH_CACHE_STALE_TTL more seconds while search_refresh re-scrapes them.
+search_cache = ResultCache(
+    ttl=int(os.getenv("SEARCH_CACHE_TTL", 1800)),
+    stale_ttl=int(os.getenv("SEARCH_CACHE_STALE_TTL", 7200)),
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 512)),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+)
@@ -0,0 +1,115 @@
+# category_store.py
+import atexit
+import json
+import os
+import threading
+from utils import file_lock, write_json_atomic
+
+
+class CategoryStore:
+    """
+    In-memory view of categories.json with case-folded set indexes per category.
+
+    New names are queued and written back on a debounce timer: the file is
+    re-read under an exclusive lock so other workers' additions are merged,
+    then replaced atomically. The request path never touches the disk.
+    """
+
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._categories = {}  # category → list of names (file order)
+        self._index = {}  # category → set of case-folded names
+        self._pending = []  # (category, name) not yet written
+        self._lock = threading.Lock()
+        self._timer = None
+        self._loaded = False
+        atexit.register(self.flush)
+
+    def load(self):
+        with self._lock:
+            self._load_locked()
+
+    def add(self, category, name):
+        """Queue a name for a category. Returns False if it is already known (case-insensitive)."""
+        self._ensure_loaded()
+        folded = name.casefold()
+        with self._lock:
+            names = self._index.setdefault(category, set())
+            if folded in names:
+                return False
+            names.add(folded)
+            self._categories.setdefault(category, []).append(name)
+            self._pending.append((category, name))
+            self._schedule_flush()
+        return True
+
+    def flush(self):
+        """Merge queued names into the file under a cross-process lock and replace it atomically."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+
+        try:
+            with file_lock(self.path):
+                categories = self._read_file()
+                known = {}
+                written = 0
+                for category, name in pending:
+                    items = categories.setdefault(category, [])
+                    if category not in known:
+                        known[category] = {item.casefold() for item in items}
+                    if name.casefold() not in known[category]:
+                        known[category].add(name.casefold())
+                        items.append(name)
+                        written += 1
+                write_json_atomic(self.path, categories, indent=2, ensure_ascii=False)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to write {self.path}: {e}")
+            with self._lock:
+                self._pending = pending + self._pending  # Retry on the next flush
+                self._schedule_flush()
+            return
+
+        with self._lock:
+            # Pick up names other workers wrote since we last loaded
+            self._replace(categories)
+            for category, name in self._pending:
+                self._index.setdefault(category, set()).add(name.casefold())
+                self._categories.setdefault(category, []).append(name)
+        print(f"[💾] categories.json updated successfully ({written} new).")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load_locked()
+
+    def _load_locked(self):
+        try:
+            categories = self._read_file()
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] categories.json not readable at {self.path}: {e}")
+            categories = {}
+        self._replace(categories)
+        self._loaded = True
+
+    def _replace(self, categories):
+        self._categories = {category: list(items) for category, items in categories.items()}
+        self._index = {category: {item.casefold() for item in items} for category, items in categories.items()}
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
@@ -3,9 +3,7 @@ from flask_bcrypt import Bcrypt
 from flask_login import UserMixin, LoginManager, login_user, logout_user, login_required
 import os
 from flask import Flask, request, jsonify
-from langchain_community.tools import WikipediaQueryRun, DuckDuckGoSearchRun
-from langchain_community.utilities import WikipediaAPIWrapper
-import soundfile as sf
+# import soundfile as sf  # Only needed by generate_tts below; import it there when TTS is re-enabled
 # from kokoro import KPipeline
 from io import BytesIO
 
@@ -27,8 +25,10 @@ def init_app(app):
     bcrypt.init_app(app)
     login_manager.init_app(app)
 
-    with app.app_context():
-        db.create_all()  # Ensure tables are created
+    # Ensure tables are created (set DB_CREATE_ALL=0 to skip the schema round-trip when it already exists)
+    if os.getenv("DB_CREATE_ALL", "1") != "0":
+        with app.app_context():
+            db.create_all()
 
 # --------------------------
 # 👤 USER MODEL (DATABASE)
@@ -52,6 +52,28 @@ class User(UserMixin, db.Model):
         """Verify the password."""
         return bcrypt.check_password_hash(self.password, password)
 
+# --------------------------
+# 🛒 SCRAPED PRODUCT CATALOG
+# --------------------------
+class ScrapedProduct(db.Model):
+    """One product as last seen on a site; full-text search over name is set up in product_catalog.py."""
+    __tablename__ = "scraped_product"
+    __table_args__ = (
+        db.UniqueConstraint("site", "url", name="uq_scraped_product_site_url"),
+        db.Index("ix_scraped_product_site_scraped_at", "site", "scraped_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    site = db.Column(db.String(40), nullable=False)
+    name = db.Column(db.String(500), nullable=False)
+    price_minor = db.Column(db.BigInteger, nullable=True)  # Integer minor units (kobo, cents); None without a price
+    currency = db.Column(db.String(3), nullable=True)
+    price_text = db.Column(db.String(100), nullable=True)  # As displayed on the site
+    rating = db.Column(db.Float, nullable=True)
+    url = db.Column(db.String(1000), nullable=False)
+    image = db.Column(db.String(1000), nullable=True)
+    scraped_at = db.Column(db.DateTime, nullable=False, index=True)
+
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login session management."""
@@ -0,0 +1,293 @@
+# extraction_engine.py
+# 🧩 Data-driven product extraction: one engine, fed by per-site selector specs.
+# Adding a marketplace (or a Konga variant) is one SITE_SPECS entry: scrap_local builds its
+# search URL and extractor from it.
+import os
+import soupsieve
+from bs4 import BeautifulSoup
+import fast_extract
+from product_matching import fuzzy_match, fuzzy_partial_match, EXCLUSION_KEYWORDS, stars_from_style
+from product import Product
+from ranking import rank_products
+
+# Spec keys:
+#   search_url   search page URL, the query (spaces → '+') is appended
+#   cards        card selector (first max_cards are parsed)
+#   name/price   field selectors (text, stripped)
+#   image        image selector, read from image_attrs in order
+#   link         link selector(s), first match wins; None reuses the name element
+#   link_prefix  always prepended to the href
+#   link_base    prepended only to root-relative hrefs ("/...")
+#   rating       {"container", "element", "attr", "parse"} → float rating
+#   exclude      keywords that drop a card (accessories etc.)
+#   match        "all" (every query word) or "partial" (any query word)
+# Every matched card is returned, best first by ranking.rank_products; callers keep as many as they show.
+SITE_SPECS = {
+    "jumia": {
+        "search_url": "https://www.jumia.com.ng/catalog/?q=",
+        "cards": "article.prd",
+        "name": "h3.name",
+        "price": "div.prc",
+        "image": "img",
+        "image_attrs": ["data-src", "src"],
+        "link": ["a.core", "a"],
+        "link_prefix": "https://www.jumia.com.ng",
+        "rating": {"container": "div.stars", "element": "div.in", "attr": "style", "parse": "star_width"},
+        "exclude": EXCLUSION_KEYWORDS
+    },
+    "konga": {
+        "search_url": "https://www.konga.com/search?search=",
+        "cards": "article.a2cf5_2S5q5",
+        "name": "h3.af885_1iPzH",
+        "price": "span.d7c0f_sJAqi",
+        "link": "a[href*='/product/']",
+        "link_prefix": "https://www.konga.com"
+    },
+    "slot": {
+        "search_url": "https://slot.ng/?s=",
+        "cards": "ul.products li",
+        "name": "h2.woocommerce-loop-product__title",
+        "price": "span.woocommerce-Price-amount",
+        "link": "a.woocommerce-LoopProduct-link"
+    },
+    "kara": {
+        "search_url": "https://www.kara.com.ng/catalogsearch/result/?q=",
+        "cards": "li.item",
+        "name": "h2.product-name a",
+        "price": "span.price",
+        "link": None
+    },
+    "ajebomarket": {
+        "search_url": "https://ajebomarket.com/?s=",
+        "cards": "div.card-wrapper",
+        "name": "h3.product__title a",
+        "price": "span.price",
+        "link": None,
+        "link_base": "https://ajebomarket.com",
+        "protocol_relative_images": True,
+        "match": "partial"
+    },
+    "topsuccess": {
+        "search_url": "https://topsuccess.ng/?s=",
+        "cards": "div.product-small",
+        "name": "p.name.product-title",
+        "price": "span.woocommerce-Price-amount",
+        "link": "a.woocommerce-LoopProduct-link"
+    },
+    "jiji": {
+        "search_url": "https://jiji.ng/search?query=",
+        "cards": "div.b-list-advert__item",
+        "name": "div.b-list-advert__title a",
+        "price": "div.b-list-advert__price",
+        "link": None,
+        "link_prefix": "https://jiji.ng"
+    }
+}
+
+MATCHERS = {"all": fuzzy_match, "partial": fuzzy_partial_match}
+RATING_PARSERS = {"star_width": stars_from_style}
+
+# ⚡ Sites parsed with lxml instead of BeautifulSoup ("all" or comma-separated site keys)
+LXML_SITES = {site.strip() for site in os.getenv("LXML_SITES", "").lower().split(",") if site.strip()}
+
+
+def uses_lxml(site):
+    return "all" in LXML_SITES or site in LXML_SITES
+
+
+class SoupBackend:
+    """BeautifulSoup (html.parser) backend with soupsieve-precompiled selectors."""
+
+    name = "bs4"
+
+    @staticmethod
+    def compile(css, limit=None):
+        return soupsieve.compile(css)
+
+    @staticmethod
+    def cards(html, selector, limit):
+        soup = BeautifulSoup(html, "html.parser")
+        return selector.select(soup, limit=limit)
+
+    @staticmethod
+    def first(element, selector):
+        return selector.select_one(element)
+
+    @staticmethod
+    def text(element):
+        return element.text.strip() if element is not None else None
+
+    @staticmethod
+    def attr(element, name):
+        return element.get(name) if element is not None else None
+
+    @staticmethod
+    def href(element):
+        return element["href"]
+
+
+class LxmlBackend:
+    """lxml backend: libxml2 parses only the card region, selectors compiled to XPath (see fast_extract.py)."""
+
+    name = "lxml"
+
+    @staticmethod
+    def compile(css, limit=None):
+        # Card selectors (the ones with a limit) also know how to parse just the card region
+        return fast_extract.CardSelector(css, limit) if limit else fast_extract.compile_css(css)
+
+    @staticmethod
+    def cards(html, selector, limit):
+        return selector.select(html)
+
+    @staticmethod
+    def first(element, selector):
+        found = selector(element)
+        return found[0] if found else None
+
+    text = staticmethod(fast_extract.text_of)
+    attr = staticmethod(fast_extract.attr_of)
+
+    @staticmethod
+    def href(element):
+        return element.attrib["href"]
+
+
+BACKENDS = {"bs4": SoupBackend, "lxml": LxmlBackend}
+
+
+class CompiledSpec:
+    """A site spec with every selector compiled for one backend."""
+
+    __slots__ = (
+        "site", "backend", "cards", "name", "price", "image", "image_attrs", "links",
+        "link_prefix", "link_base", "protocol_relative_images", "rating", "exclude",
+        "match", "max_cards"
+    )
+
+    def __init__(self, site, spec, backend):
+        compile_css = backend.compile
+        self.site = site
+        self.backend = backend
+        self.max_cards = spec.get("max_cards", 30)
+        self.cards = compile_css(spec["cards"], limit=self.max_cards)
+        self.name = compile_css(spec["name"])
+        self.price = compile_css(spec["price"])
+        self.image = compile_css(spec.get("image", "img"))
+        self.image_attrs = tuple(spec.get("image_attrs", ["src"]))
+
+        links = spec.get("link")
+        if isinstance(links, str):
+            links = [links]
+        self.links = tuple(compile_css(css) for css in links) if links else ()
+        self.link_prefix = spec.get("link_prefix", "")
+        self.link_base = spec.get("link_base")
+        self.protocol_relative_images = spec.get("protocol_relative_images", False)
+
+        rating = spec.get("rating")
+        self.rating = (
+            compile_css(rating["container"]),
+            compile_css(rating["element"]),
+            rating["attr"],
+            RATING_PARSERS[rating["parse"]]
+        ) if rating else None
+
+        self.exclude = tuple(kw.lower() for kw in spec.get("exclude", ()))
+        self.match = MATCHERS[spec.get("match", "all")]
+
+
+def compile_specs(specs):
+    return {
+        engine: {site: CompiledSpec(site, spec, backend) for site, spec in specs.items()}
+        for engine, backend in BACKENDS.items()
+    }
+
+
+# Compiled once at import, for both backends
+COMPILED_SPECS = compile_specs(SITE_SPECS)
+
+
+def _parse_card(card, spec, product_query):
+    """Extract one Product from a card, or None if it is incomplete, excluded or unmatched."""
+    b = spec.backend
+    name_elem = b.first(card, spec.name)
+    name = b.text(name_elem)
+    if not name:
+        return None
+
+    if spec.exclude:
+        name_lower = name.lower()
+        if any(kw in name_lower for kw in spec.exclude):
+            return None
+
+    price = b.text(b.first(card, spec.price))
+
+    image_elem = b.first(card, spec.image)
+    image = None
+    if image_elem is not None:
+        for attr in spec.image_attrs:
+            image = b.attr(image_elem, attr)
+            if image:
+                break
+    if image and spec.protocol_relative_images and image.startswith("//"):
+        image = "https:" + image
+
+    link_elem = None
+    for selector in spec.links:
+        link_elem = b.first(card, selector)
+        if link_elem is not None:
+            break
+    else:
+        if not spec.links:
+            link_elem = name_elem
+
+    link = None
+    if link_elem is not None:
+        if spec.link_base:
+            link = b.attr(link_elem, "href")
+            if link and link.startswith("/"):
+                link = spec.link_base + link
+        else:
+            link = spec.link_prefix + b.href(link_elem)
+
+    rating = None
+    if spec.rating:
+        container_sel, element_sel, attr, parse = spec.rating
+        container = b.first(card, container_sel)
+        element = b.first(container, element_sel) if container is not None else None
+        rating = parse(b.attr(element, attr) or "") or 0.0
+
+    if not (price and link and image and spec.match(product_query, name)):
+        return None
+
+    return Product(spec.site, name, price, rating=rating, url=link, image=image)
+
+
+def extract_site(site, html, product_query, engine=None):
+    """Run the spec-driven extractor for a site with the chosen (or configured) parsing engine."""
+    engine = engine or ("lxml" if uses_lxml(site) else "bs4")
+    spec = COMPILED_SPECS[engine][site]
+    if not html:
+        return []
+
+    cards = spec.backend.cards(html, spec.cards, spec.max_cards)
+    products = []
+    for card in cards:
+        try:
+            product = _parse_card(card, spec, product_query)
+        except Exception:
+            continue
+        if product:
+            products.append(product)
+
+    print(f"[DEBUG] {site} ({engine}): {len(cards)} cards, {len(products)} matches")
+
+    return rank_products(product_query, products)
+
+
+def make_extractor(site, engine=None):
+    """Build an extract_<site>_data(html, product_query) style callable for a site."""
+    def extractor(html, product_query):
+        return extract_site(site, html, product_query, engine=engine)
+    extractor.__name__ = f"extract_{site}_data"
+    return extractor
@@ -0,0 +1,119 @@
+# fast_extract.py
+# ⚡ lxml helpers behind extraction_engine's "lxml" backend: selectors are compiled to
+# XPath once, and libxml2 only parses the card region of a page: from the first card
+# container to the end of the last card needed. Page chrome and scripts before the
+# cards and everything after them are never parsed.
+import re
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
+
+# Bytes fed to the pull parser between checks for the last needed card
+FEED_CHUNK = 16 * 1024
+
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+# One compound selector: optional tag, then classes ("ul.products", "article.prd", "li")
+_COMPOUND = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+_translator = HTMLTranslator()
+_compiled = {}
+
+
+def compile_css(css, limit=None, prefix="descendant::"):
+    """Compile a CSS selector to an XPath callable (cached). limit keeps only the first N matches."""
+    key = (css, limit, prefix)
+    xpath = _compiled.get(key)
+    if xpath is None:
+        expr = _translator.css_to_xpath(css, prefix=prefix)
+        if limit:
+            expr = f"({expr})[position() <= {limit}]"
+        xpath = _compiled[key] = etree.XPath(expr)
+    return xpath
+
+
+def parse_document(html):
+    """Parse a page with libxml2; returns the root element, or None for an empty/unparseable page."""
+    if not html:
+        return None
+    data = html.encode("utf-8") if isinstance(html, str) else html
+    try:
+        return lxml.html.document_fromstring(data, parser=HTML_PARSER)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+class CardSelector:
+    """
+    A card selector that knows where its cards start in the raw page. select()
+    parses from the first element matching the selector's outermost compound
+    (so every ancestor the selector needs is kept) and stops feeding the parser
+    once the first `limit` cards are complete. Selectors it can't anchor
+    (commas, attributes, pseudo-classes) parse the whole page.
+    """
+
+    def __init__(self, css, limit):
+        self.css = css
+        self.limit = limit
+        self.xpath = compile_css(css, limit, prefix="descendant-or-self::")
+        compounds = css.split()
+        first, last = _COMPOUND.match(compounds[0]), _COMPOUND.match(compounds[-1])
+        self.anchor = _anchor_pattern(*first.groups()) if first and last and "," not in css else None
+        # Only elements with the last compound's tag can be cards, so only their end events are watched
+        self.card_tag = last.group(1).lower() if self.anchor and last.group(1) else None
+
+    def __call__(self, element):
+        return self.xpath(element)
+
+    def select(self, html):
+        """The first `limit` card elements of a page (same result as parsing all of it)."""
+        if not html:
+            return []
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        match = self.anchor.search(data) if self.anchor else None
+        if match is None:
+            root = parse_document(data)
+            return self.xpath(root) if root is not None else []
+        return self._select_from(data, match.start())
+
+    def _select_from(self, data, start):
+        parser = etree.HTMLPullParser(events=("end",), tag=self.card_tag, encoding="utf-8")
+        parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())  # text_content() etc., as in parse_document
+        ended = set()  # Card candidates whose closing tag has been parsed
+        root = None
+        for offset in range(start, len(data), FEED_CHUNK):
+            parser.feed(data[offset:offset + FEED_CHUNK])
+            events = list(parser.read_events())
+            for _, element in events:
+                ended.add(element)
+                root = element.getroottree().getroot()
+            if root is not None and len(ended) >= self.limit:
+                cards = self.xpath(root)
+                # A card that hasn't closed yet (e.g. wrapping later cards) still needs its subtree
+                if len(cards) >= self.limit and all(card in ended for card in cards):
+                    break
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            return []
+        return self.xpath(root) if root is not None else []
+
+
+def _anchor_pattern(tag, classes):
+    """Regex for the opening tag of the first element a compound selector matches."""
+    tag_re = re.escape(tag.lower()).encode() if tag else rb"[a-zA-Z][\w-]*"
+    class_names = [c for c in classes.split(".") if c]
+    if not class_names:
+        return re.compile(rb"<" + tag_re + rb"\b", re.IGNORECASE)
+    # Only the first class is checked: a looser anchor starts parsing earlier, never later
+    class_re = re.escape(class_names[0]).encode()
+    return re.compile(
+        rb"<" + tag_re + rb"\b[^>]*?\sclass\s*=\s*[\"']?[^\"'>]*?(?<![\w-])" + class_re + rb"(?![\w-])",
+        re.IGNORECASE
+    )
+
+
+def text_of(element):
+    return element.text_content().strip() if element is not None else None
+
+
+def attr_of(element, name):
+    return element.get(name) if element is not None else None
@@ -0,0 +1,135 @@
+# http_client.py
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from response_store import response_store, ReplayMiss, RESPONSE_STORE_STALE_TTL
+from provider_health import health, is_provider_failure, ProviderUnavailable
+from provider_budget import provider_budget, credit_cost, BudgetExceeded
+from retry_policy import remaining_time, DeadlineExceeded
+from utils import env_number
+
+load_dotenv()
+
+# 🌐 Scraping providers every fetch path goes through
+PROVIDER_URLS = {
+    "scraperapi": "https://api.scraperapi.com/",
+    "scrapingbee": "https://app.scrapingbee.com/api/v1",
+    "scrapingdog": "https://api.scrapingdog.com/scrape",
+    "zenrows": "https://api.zenrows.com/v1/"
+}
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+# Pool sizes and timeouts, overridable globally or per provider (e.g. HTTP_POOL_MAXSIZE_SCRAPERAPI)
+HTTP_POOL_CONNECTIONS = env_number("HTTP_POOL_CONNECTIONS", 2, int)
+HTTP_POOL_MAXSIZE = env_number("HTTP_POOL_MAXSIZE", 10, int)
+HTTP_CONNECT_TIMEOUT = env_number("HTTP_CONNECT_TIMEOUT", 10.0, float)
+# Rendered proxy calls routinely take 20-60s, so the read timeout is generous
+HTTP_READ_TIMEOUT = env_number("HTTP_READ_TIMEOUT", 70.0, float)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def pool_settings(provider):
+    """Return (pool_connections, pool_maxsize, (connect_timeout, read_timeout)) for a provider."""
+    suffix = provider.upper()
+    return (
+        env_number(f"HTTP_POOL_CONNECTIONS_{suffix}", HTTP_POOL_CONNECTIONS, int),
+        env_number(f"HTTP_POOL_MAXSIZE_{suffix}", HTTP_POOL_MAXSIZE, int),
+        (
+            env_number(f"HTTP_CONNECT_TIMEOUT_{suffix}", HTTP_CONNECT_TIMEOUT, float),
+            env_number(f"HTTP_READ_TIMEOUT_{suffix}", HTTP_READ_TIMEOUT, float)
+        )
+    )
+
+
+def get_session(provider):
+    """Return the shared keep-alive session for a provider, creating it on first use."""
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            pool_connections, pool_maxsize, _ = pool_settings(provider)
+            # Retries are handled by the callers, not by urllib3
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+        return session
+
+
+def get(provider, url=None, params=None, headers=None, timeout=None):
+    """
+    GET through the provider's pooled session. url defaults to the provider's
+    proxy endpoint; timeout defaults to the provider's configured timeouts.
+    Successful responses are served from / recorded to the on-disk response store.
+    Raises ProviderUnavailable while the provider's circuit breaker is open,
+    BudgetExceeded (after trying a stale stored page) when it is over its budget,
+    and DeadlineExceeded once the request deadline (retry_policy) has run out.
+    The read timeout never runs past that deadline.
+    """
+    if provider not in PROVIDER_URLS:
+        raise ValueError(f"Unknown provider: {provider}")
+
+    url = url or PROVIDER_URLS[provider]
+
+    stored = response_store.load(provider, url, params)
+    if stored is not None:
+        print(f"[STORE] 💾 Served {provider} response from disk")
+        return stored
+    if response_store.replay_only:
+        raise ReplayMiss(f"No recorded {provider} response for {(params or {}).get('url', url)}")
+
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Request deadline passed before calling {provider}")
+
+    # Breaker first: a call it rejects must not spend rate-limit tokens or credits
+    tracker = health(provider)
+    if not tracker.allow():
+        raise ProviderUnavailable(f"{provider} circuit breaker is open")
+
+    # 🚦 Over the rate limit or credit budget: serve a stale recorded page if there is one, else fail fast
+    if not provider_budget.acquire(provider, credit_cost(provider, params)):
+        tracker.release()
+        stale = response_store.load(provider, url, params, max_age=RESPONSE_STORE_STALE_TTL)
+        if stale is not None:
+            print(f"[STORE] 💾 Served stale {provider} response (budget)")
+            return stale
+        raise BudgetExceeded(f"{provider} is over its rate limit or credit budget")
+
+    if timeout is None:
+        timeout = pool_settings(provider)[2]
+    if remaining is not None:
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        timeout = (min(connect, remaining), min(read, remaining))
+
+    # Every network call feeds the provider's latency/error window; transport errors,
+    # timeouts, 429 and 5xx are failures (the same split retry_policy.classify retries on)
+    start = time.monotonic()
+    ok = False
+    try:
+        response = get_session(provider).get(url, params=params, headers=headers, timeout=timeout)
+        ok = not is_provider_failure(response.status_code)
+    finally:
+        tracker.record(time.monotonic() - start, ok)
+
+    response_store.save(provider, url, params, response)
+    return response
+
+
+def close_all():
+    """Close every pooled session (e.g. in a gunicorn worker_exit hook)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
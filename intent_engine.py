@@ -0,0 +1,138 @@
+# intent_engine.py
+# ⚡ One compiled pass over a chat message: small-talk intent + brand.
+# TextBlob noun phrases are only a cached slow path for product extraction.
+import os
+import re
+from functools import lru_cache
+
+GREETINGS = {"hi", "hello", "hey", "xup", "yo", "howdy"}
+
+# Substring phrases per intent, checked in INTENT_PRIORITY order
+INTENT_PHRASES = {
+    "how_are_you": ["how are you"],
+    "emotional": ["i'm sick", "i feel sad", "i'm tired", "i'm depressed", "i'm stressed"],
+    "gratitude": ["thank", "thanks", "appreciate it", "grateful", "thank you", "love it", "great", "nice one"],
+    "identity": ["who are you", "what are you"]
+}
+INTENT_PRIORITY = ("greeting", "how_are_you", "emotional", "gratitude", "identity")
+
+# Brand → keywords; the first brand in this order wins when several match
+BRAND_KEYWORDS = {
+    "samsung": ["samsung", "galaxy"],
+    "iphone": ["iphone", "ios", "apple"],
+    "tecno": ["tecno", "camon", "phantom"],
+    "infinix": ["infinix", "hot", "zero", "note"],
+    "xiaomi": ["xiaomi", "redmi", "poco", "mi"],
+    "sony": ["sony", "bravia", "xperia"],
+    "lg": ["lg"],
+    "hp": ["hp", "pavilion", "envy", "omen"],
+    "dell": ["dell", "inspiron", "xps", "latitude"],
+    "nokia": ["nokia"],
+    "apple": ["macbook", "mac", "ipad", "apple"]
+}
+
+PRODUCT_PATTERN = re.compile(
+    r"(?:i want to buy|buy|get|fetch|search(?: for)?|look(?:ing)?(?: for)?)\s+(.*)", re.IGNORECASE
+)
+SITE_SUFFIX_PATTERN = re.compile(r"\b(from amazon|from jumia|on amazon|on jumia)\b", re.IGNORECASE)
+ARTICLE_PATTERN = re.compile(r"^(an|a|the)\s+", re.IGNORECASE)
+
+# TextBlob fallback for messages without a buy/search verb ("0" disables it)
+NOUN_PHRASE_FALLBACK = os.getenv("NOUN_PHRASE_FALLBACK", "1") != "0"
+
+
+def _alternation(words):
+    # Longest first so "thank you" is preferred over "thank"
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+
+def _build_matcher():
+    phrase_intent = {}
+    for intent, phrases in INTENT_PHRASES.items():
+        for phrase in phrases:
+            phrase_intent.setdefault(phrase, intent)
+
+    keyword_brand = {}
+    brand_rank = {}
+    for rank, (brand, keywords) in enumerate(BRAND_KEYWORDS.items()):
+        brand_rank[brand] = rank
+        for keyword in keywords:
+            keyword_brand.setdefault(keyword, brand)
+
+    # Intent phrases match anywhere; brand keywords must start a word and not run into more letters ("hp15" ok, "shp" not)
+    pattern = re.compile(
+        rf"(?P<phrase>{_alternation(phrase_intent)})|(?<![a-z])(?P<brand>{_alternation(keyword_brand)})(?![a-z])"
+    )
+    return pattern, phrase_intent, keyword_brand, brand_rank
+
+
+MATCHER, PHRASE_INTENT, KEYWORD_BRAND, BRAND_RANK = _build_matcher()
+
+
+class Analysis:
+    """Intent (or None) and brand (or None) found in one message."""
+
+    __slots__ = ("intent", "brand")
+
+    def __init__(self, intent, brand):
+        self.intent = intent
+        self.brand = brand
+
+
+def analyze(text):
+    """Classify small-talk intent and find the brand in a single regex pass."""
+    lower = text.lower().strip()
+    intents = set()
+    brand = None
+
+    if lower in GREETINGS:
+        intents.add("greeting")
+
+    for match in MATCHER.finditer(lower):
+        phrase = match.group("phrase")
+        if phrase:
+            intents.add(PHRASE_INTENT[phrase])
+            continue
+        found = KEYWORD_BRAND[match.group("brand")]
+        if brand is None or BRAND_RANK[found] < BRAND_RANK[brand]:
+            brand = found
+
+    intent = next((name for name in INTENT_PRIORITY if name in intents), None)
+    return Analysis(intent, brand.capitalize() if brand else None)
+
+
+def extract_product(text):
+    """Product after a buy/search verb; otherwise the first noun phrase (slow path, cached)."""
+    match = PRODUCT_PATTERN.search(text)
+    if match:
+        product = SITE_SUFFIX_PATTERN.sub("", match.group(1).strip())
+        product = ARTICLE_PATTERN.sub("", product)
+        return product.strip()
+    if NOUN_PHRASE_FALLBACK:
+        return first_noun_phrase(text)
+    return None
+
+
+@lru_cache(maxsize=2048)
+def first_noun_phrase(text):
+    global NOUN_PHRASE_FALLBACK
+    try:
+        from textblob import TextBlob  # Imported on first use: loads NLTK corpora
+        from textblob.exceptions import MissingCorpusError
+    except ImportError:
+        NOUN_PHRASE_FALLBACK = False
+        return None
+
+    try:
+        noun_phrases = TextBlob(text).noun_phrases
+    except MissingCorpusError:
+        print("[WARN] TextBlob corpora missing (python -m textblob.download_corpora); noun-phrase fallback disabled")
+        NOUN_PHRASE_FALLBACK = False
+        return None
+    return noun_phrases[0].strip() if noun_phrases else None
+
+
+def warm_up():
+    """Load TextBlob's noun-phrase extractor ahead of the first message that needs it."""
+    if NOUN_PHRASE_FALLBACK:
+        first_noun_phrase("warm up the noun phrase extractor")
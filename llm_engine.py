@@ -3,15 +3,33 @@
 import re
 import os
 import json
+import hashlib
 from dotenv import load_dotenv
-from textblob import TextBlob
-from groq import Groq
+import threading
 from trigger import detect_fetch_trigger, generate_fetch_response
+from cache_config import ResultCache
+from session_store import SessionStore
+from single_flight import SingleFlight
+from intent_engine import analyze, extract_product
 
 # Load API Key
 load_dotenv()
 groq_api_key = os.getenv("groq_api")
-client = Groq(api_key=groq_api_key)
+
+# Groq client, built on first use (or by the startup warm-up) instead of at import
+client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from groq import Groq
+                client = Groq(api_key=groq_api_key)
+    return client
+
 
 SYSTEM_PROMPT = (
     "You are AceBot, an intelligent e-commerce assistant. Your job is to assist users in finding products, "
@@ -29,90 +47,92 @@ SYSTEM_PROMPT = (
     "- After products are fetched and displayed, generate a short, helpful summary comparing them based on features, price range, and best available deals."
 )
 
-user_history = []
-user_context = {"product": None, "brand": None}
-FIRST_RESPONSE = True
+# 🗃️ Fallback completions for repeated questions, keyed by prompt + product context
+completion_cache = ResultCache(
+    ttl=int(os.getenv("COMPLETION_CACHE_TTL", 3600)),
+    max_entries=int(os.getenv("COMPLETION_CACHE_MAX_ENTRIES", 1024)),
+    max_bytes=int(os.getenv("COMPLETION_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+)
+
+PROMPT_NOISE = re.compile(r"[^\w\s'-]+")
+
+# 💬 Conversation state per session: last CHAT_HISTORY_TURNS turns, dropped after CHAT_SESSION_IDLE seconds idle
+sessions = SessionStore(
+    max_turns=int(os.getenv("CHAT_HISTORY_TURNS", 20)),
+    idle_ttl=int(os.getenv("CHAT_SESSION_IDLE", 1800)),
+    max_sessions=int(os.getenv("CHAT_MAX_SESSIONS", 5000))
+)
+DEFAULT_SESSION = "default"  # Callers without a session (scripts, tests) share this one
 
 # === Helper Functions ===
 
 def is_emotional(user_input):
-    return any(x in user_input.lower() for x in ["i'm sick", "i feel sad", "i'm tired", "i'm depressed", "i'm stressed"])
+    return analyze(user_input).intent == "emotional"
 
 def is_greeting(user_input):
-    return user_input.lower().strip() in ["hi", "hello", "hey", "xup", "yo", "howdy"]
+    return analyze(user_input).intent == "greeting"
 
 def is_gratitude(user_input):
-    return any(x in user_input.lower() for x in ["thank", "thanks", "appreciate it", "grateful", "thank you", "love it", "great", "nice one"])
-
-def extract_product(user_input):
-    match = re.search(r"(?:i want to buy|buy|get|fetch|search(?: for)?|look(?:ing)?(?: for)?)\s+(.*)", user_input, re.IGNORECASE)
-    if match:
-        product = match.group(1).strip()
-        product = re.sub(r"\b(from amazon|from jumia|on amazon|on jumia)\b", "", product, flags=re.IGNORECASE)
-        product = re.sub(r"^(an|a|the)\s+", "", product, flags=re.IGNORECASE)
-        return product.strip()
-    blob = TextBlob(user_input)
-    noun_phrases = blob.noun_phrases
-    if noun_phrases:
-        return noun_phrases[0].strip()
-    return None
+    return analyze(user_input).intent == "gratitude"
 
 def extract_brand(user_input):
-    user_input_lower = user_input.lower()
-
-    # Known direct brand keywords
-    brands = {
-        "samsung": ["samsung", "galaxy"],
-        "iphone": ["iphone", "ios", "apple"],
-        "tecno": ["tecno", "camon", "phantom"],
-        "infinix": ["infinix", "hot", "zero", "note"],
-        "xiaomi": ["xiaomi", "redmi", "poco", "mi"],
-        "sony": ["sony", "bravia", "xperia"],
-        "lg": ["lg"],
-        "hp": ["hp", "pavilion", "envy", "omen"],
-        "dell": ["dell", "inspiron", "xps", "latitude"],
-        "nokia": ["nokia"],
-        "apple": ["macbook", "mac", "ipad", "apple"]
-    }
+    return analyze(user_input).brand
+
 
-    for brand, keywords in brands.items():
-        for keyword in keywords:
-            if keyword in user_input_lower:
-                return brand.capitalize()
+def normalize_prompt(text):
+    """Lowercase, drop punctuation and collapse whitespace so near-identical questions share a key."""
+    return " ".join(PROMPT_NOISE.sub(" ", text.lower()).split())
 
-    return None
+
+def completion_key(user_input, context):
+    record = {
+        "q": normalize_prompt(user_input),
+        "product": normalize_prompt(context.get("product") or ""),
+        "brand": normalize_prompt(context.get("brand") or "")
+    }
+    return "completion:" + hashlib.sha256(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
 
 
 # === Main LLM Chat Handler ===
 
-def query_llama3(user_input):
-    global FIRST_RESPONSE
+def query_llama3(user_input, session_id=None):
+    """Reply to a chat message using (and updating) the conversation state of session_id."""
+    state = sessions.get(session_id or DEFAULT_SESSION)
+    with state.lock:
+        return _respond(state, user_input)
+
+
+def _respond(state, user_input):
+    user_context = state.context
 
     user_input = user_input.strip()
-    user_history.append(user_input.lower())
+    state.add_turn(user_input.lower())
     lower_input = user_input.lower()
 
     # === Basic Conversations ===
-    if is_greeting(lower_input):
-        response = "Hi! 😊 I'm AceBot, your e-commerce assistant! What product are you looking for today?" if FIRST_RESPONSE else "Hey again! What would you like to find today?"
-        FIRST_RESPONSE = False
+    analysis = analyze(lower_input)
+    intent = analysis.intent
+
+    if intent == "greeting":
+        response = "Hi! 😊 I'm AceBot, your e-commerce assistant! What product are you looking for today?" if state.first_response else "Hey again! What would you like to find today?"
+        state.first_response = False
         return response
 
-    if "how are you" in lower_input:
+    if intent == "how_are_you":
         return "I'm doing great, thanks for asking! 😊 How can I help you shop today?"
 
-    if is_emotional(lower_input):
+    if intent == "emotional":
         return "I'm really sorry to hear that 💙. If browsing helps, I'm here to assist you anytime."
 
-    if is_gratitude(lower_input):
+    if intent == "gratitude":
         return "You're welcome! Let me know if you're looking for something specific. 😊"
 
-    if "who are you" in lower_input or "what are you" in lower_input:
+    if intent == "identity":
         return "I’m AceBot, your e-commerce assistant! 😊 Ready to help you find the best deals."
 
     # === Product & Brand Extraction ===
     product = extract_product(user_input)
-    brand = extract_brand(user_input)
+    brand = analysis.brand
 
     if product:
         user_context["product"] = product
@@ -131,12 +151,12 @@ def query_llama3(user_input):
     triggered_site = detect_fetch_trigger(user_input)
     if triggered_site:
         vague_terms = ["it", "this", "that", f"it from {triggered_site}", f"from {triggered_site}"]
-        product_name = user_context.get("product", "").strip().lower()
+        product_name = (user_context.get("product") or "").strip().lower()
 
         # Try to recover from history if the product name is vague
         if not product_name or product_name in vague_terms:
-            for past_input in reversed(user_history[:-1]):
-                recovered = extract_product(past_input)
+            for turn in state.previous_turns():
+                recovered = turn.product(extract_product)
                 if recovered and recovered.lower() not in vague_terms:
                     product_name = recovered.strip()
                     break
@@ -154,8 +174,16 @@ def query_llama3(user_input):
     product_context = f"{user_context['brand'] or ''} {user_context['product'] or ''}".strip()
     user_prompt = f"User: {user_input}\nContext: The user is interested in buying a {product_context}.\nAssistant:"
 
+    key = completion_key(user_input, user_context)
+
     def stream_response():
-        response = client.chat.completions.create(
+        cached = completion_cache.get(key)
+        if cached is not None:
+            print("[CACHE] ✅ Completion hit")
+            yield cached
+            return
+
+        response = get_client().chat.completions.create(
             model="llama-3.1-8b-instant",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -163,40 +191,140 @@ def query_llama3(user_input):
             ],
             stream=True
         )
+        parts = []
         for chunk in response:
             if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
                 yield chunk.choices[0].delta.content
 
-    FIRST_RESPONSE = False
+        # Only a completed stream is cached; a client disconnect stops the loop above
+        completion = "".join(parts)
+        if completion.strip():
+            completion_cache.set(key, completion)
+
+    state.first_response = False
     return stream_response()
 
 
 
 # === Product Summary Generator ===
 
-def summarize_products(query, results):
-    flat_products = []
-    for site in results:
-        for item in site["data"]:
-            flat_products.append({
-                "title": item.get("title", ""),
-                "price": item.get("price", ""),
-                "site": item.get("source", site.get("site", "")),
-                "link": item.get("link", "")
-            })
-
-    prompt = (
-        f"Given the following search for '{query}', summarize the product listings shown below. "
-        "Highlight differences in price ranges, notable features, and which site seems to offer the best deals.\n\n"
-        f"Products:\n{json.dumps(flat_products[:10], indent=2)}"
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "llama-3.1-8b-instant")
+SUMMARY_MAX_PRODUCTS = int(os.getenv("SUMMARY_MAX_PRODUCTS", 10))
+SUMMARY_PROMPT_TOKENS = int(os.getenv("SUMMARY_PROMPT_TOKENS", 400))  # Budget for the product listing
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 300))  # Cap on the generated summary
+SUMMARY_NAME_CHARS = 80
+
+# The chat rules in SYSTEM_PROMPT don't apply to summaries; this keeps every summary call small
+SUMMARY_SYSTEM_PROMPT = (
+    "You are AceBot, an e-commerce assistant. Write a short, helpful summary of product listings: "
+    "compare price ranges and notable features, and say which site offers the best deal."
+)
+
+# 🗃️ Summaries keyed by query + displayed products, so repeat searches skip the LLM
+summary_cache = ResultCache(
+    ttl=int(os.getenv("SUMMARY_CACHE_TTL", 3600)),
+    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 256)),
+    max_bytes=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", 2 * 1024 * 1024))
+)
+
+
+# 🛫 Concurrent requests for the same summary share one generation
+summary_flights = SingleFlight("summary")
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) used for the prompt budget."""
+    return (len(text) + 3) // 4
+
+
+def summary_products(results):
+    """Flatten the displayed site blocks (Product records) into (name, price, site) rows."""
+    rows = []
+    for site in results or []:
+        for item in site.get("data", []):
+            name = " ".join((item.name or "").split())
+            if not name:
+                continue
+            rows.append((name, item.price_text or "", item.site or site.get("site", "")))
+    return rows
+
+
+def summary_key(query, rows):
+    """Stable hash of the normalized query and the product set (order-independent)."""
+    record = {"q": " ".join(query.lower().split()), "p": sorted(rows)}
+    return "summary:" + hashlib.sha256(json.dumps(record, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def build_summary_prompt(query, rows, token_budget=None):
+    """One "name | price | site" line per product, stopping at the token budget."""
+    token_budget = SUMMARY_PROMPT_TOKENS if token_budget is None else token_budget
+    lines = []
+    used = 0
+    for name, price, site in rows[:SUMMARY_MAX_PRODUCTS]:
+        if len(name) > SUMMARY_NAME_CHARS:
+            name = name[:SUMMARY_NAME_CHARS - 1].rstrip() + "…"
+        line = f"- {name} | {price} | {site}"
+        cost = estimate_tokens(line) + 1
+        if lines and used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+
+    listing = "\n".join(lines)
+    return (
+        f"Search: '{query}'. Summarize these listings (name | price | site): price range, "
+        f"notable features and the best deal.\n{listing}"
     )
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ]
+
+def _summary_messages(query, rows):
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": build_summary_prompt(query, rows)}
+    ]
+
+
+def summarize_products(query, results):
+    """Full summary text; shares the streamed generation (and its cache) with stream_summary."""
+    return "".join(stream_summary(query, results)).strip()
+
+
+def stream_summary(query, results):
+    """
+    Yield the summary as text chunks as the model produces them. A cached
+    summary is yielded whole, concurrent requests for the same summary share
+    one generation, and a completed stream is cached.
+    """
+    rows = summary_products(results)
+    if not rows:
+        return iter(())
+
+    key = summary_key(query, rows)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        print(f"[CACHE] ✅ Summary hit for '{query}'")
+        return iter((cached,))
+
+    return summary_flights.stream(key, lambda: _generate_summary(key, query, rows))
+
+
+def _generate_summary(key, query, rows):
+    response = get_client().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=_summary_messages(query, rows),
+        max_tokens=SUMMARY_MAX_TOKENS,
+        stream=True
     )
 
-    return response.choices[0].message.content.strip()
+    parts = []
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            text = chunk.choices[0].delta.content
+            parts.append(text)
+            yield text
+
+    # Only a stream that ran to completion is cached
+    summary = "".join(parts).strip()
+    if summary:
+        summary_cache.set(key, summary)
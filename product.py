@@ -0,0 +1,93 @@
+# product.py
+# 🏷️ Compact product record every extractor returns. The price is parsed once into
+# integer minor units + currency; dicts are only built at the response boundary (to_dict).
+import re
+from decimal import Decimal, InvalidOperation
+
+CURRENCY_SYMBOLS = {"₦": "NGN", "NGN": "NGN", "$": "USD", "USD": "USD", "£": "GBP", "€": "EUR"}
+SITE_CURRENCIES = {"amazon": "USD"}
+DEFAULT_CURRENCY = "NGN"
+# Minor units per major unit (kobo, cents, pence)
+MINOR_UNITS = {"NGN": 100, "USD": 100, "GBP": 100, "EUR": 100}
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(price, site=None):
+    """(minor units, currency) from a displayed price like '₦ 12,500' or '$29.99'; ranges use the low end."""
+    if price is None:
+        return None, None
+    if isinstance(price, (int, float, Decimal)):
+        currency = SITE_CURRENCIES.get(site, DEFAULT_CURRENCY)
+        return int(round(Decimal(str(price)) * MINOR_UNITS[currency])), currency
+
+    text = str(price)
+    match = _NUMBER.search(text)
+    if not match:
+        return None, None
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    currency = currency or SITE_CURRENCIES.get(site, DEFAULT_CURRENCY)
+    try:
+        amount = Decimal(match.group().replace(",", ""))
+    except InvalidOperation:
+        return None, None
+    return int(round(amount * MINOR_UNITS.get(currency, 100))), currency
+
+
+class Product:
+    """One scraped product. price_text is the price as the site shows it (what the UI displays)."""
+
+    __slots__ = ("site", "name", "price_minor", "currency", "price_text", "rating", "url", "image")
+
+    def __init__(self, site, name, price=None, rating=None, url=None, image=None, price_minor=None, currency=None):
+        self.site = site
+        self.name = name
+        self.price_text = None if price is None else str(price)
+        if price_minor is None and price is not None:
+            price_minor, currency = parse_price(price, site)
+        self.price_minor = price_minor
+        self.currency = currency
+        self.rating = None if rating is None else float(rating)
+        self.url = url
+        self.image = image
+
+    @property
+    def amount(self):
+        """Price in major units (e.g. naira), or None when the site shows none."""
+        if self.price_minor is None:
+            return None
+        return self.price_minor / MINOR_UNITS.get(self.currency, 100)
+
+    def to_dict(self, source=None):
+        """The JSON shape the frontend reads; rating is only present for sites that show one."""
+        product = {"name": self.name, "price": self.price_text}
+        if self.rating is not None:
+            product["rating"] = self.rating
+        product["url"] = self.url
+        product["image"] = self.image
+        if source is not None:
+            product["source"] = source
+        return product
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Product({self.site!r}, {self.name[:40]!r}, {self.price_text!r}, rating={self.rating})"
+
+
+def products_to_dicts(products):
+    """Serialize a flat (e.g. ranked) Product list; each product carries its own site as source."""
+    return [p.to_dict(source=p.site) for p in products]
+
+
+def blocks_to_dicts(results, tag_source=True):
+    """Serialize [{"site", "data": [Product]}] blocks for a response; products get their source site."""
+    return [
+        {"site": block["site"], "data": [p.to_dict(source=block["site"] if tag_source else None) for p in block["data"]]}
+        for block in results or []
+    ]
@@ -0,0 +1,306 @@
+# product_catalog.py
+# 🛒 Local catalog of scraped products (engine.ScrapedProduct) with full-text search
+# over names: SQLite FTS5 locally, a tsvector GIN index on Postgres. Searches are
+# answered from it while its products are fresh; writes are batched off the request path.
+import atexit
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from cache_config import search_cache
+from engine import db, ScrapedProduct
+from product import Product
+from ranking import rank_products
+
+CATALOG_ENABLED = os.getenv("PRODUCT_CATALOG", "1") != "0"
+# Products older than this (seconds) are too stale to answer a search with; defaults to the
+# search cache TTL so the catalog never serves prices the cache would have expired
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", search_cache.ttl))
+# A category search needs this many sites with enough fresh products (capped by max_sites)
+CATALOG_MIN_SITES = int(os.getenv("CATALOG_MIN_SITES", 2))
+CATALOG_FLUSH_INTERVAL = float(os.getenv("CATALOG_FLUSH_INTERVAL", 2))
+# Rows not seen again for this many days are pruned
+CATALOG_RETENTION_DAYS = int(os.getenv("CATALOG_RETENTION_DAYS", 30))
+# Rows per INSERT ... ON CONFLICT statement
+CATALOG_UPSERT_CHUNK = 500
+# Failed flushes in a row after which the queued products are dropped instead of queued again
+CATALOG_MAX_FAILED_FLUSHES = int(os.getenv("CATALOG_MAX_FAILED_FLUSHES", 5))
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE; others fall back to select-then-write
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+UPSERT_COLUMNS = ("name", "price_minor", "currency", "price_text", "rating", "image", "scraped_at")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+FTS_TABLE = "scraped_product_fts"
+
+SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(name, content='scraped_product', content_rowid='id')",
+    f"""CREATE TRIGGER IF NOT EXISTS scraped_product_ai AFTER INSERT ON scraped_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS scraped_product_ad AFTER DELETE ON scraped_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS scraped_product_au AFTER UPDATE OF name ON scraped_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END"""
+]
+
+POSTGRES_FTS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_scraped_product_name_fts ON scraped_product USING GIN (to_tsvector('simple', name))"
+]
+
+
+@event.listens_for(ScrapedProduct.__table__, "after_create")
+def create_search_index(target, connection, **kw):
+    """Create the dialect's full-text index right after create_all() creates the table."""
+    statements = {"sqlite": SQLITE_FTS_DDL, "postgresql": POSTGRES_FTS_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def query_terms(query):
+    return [term for term in _TOKEN.findall(query.lower()) if len(term) > 1][:8]
+
+
+class ProductCatalog:
+    """
+    Scraped products persisted to the database. record() only queues; a
+    debounce timer upserts the batch (by site + url) inside the app context.
+    search_blocks() returns fresh matches in the same {"site", "data"} shape
+    the scrapers produce, or None so the caller scrapes instead.
+    """
+
+    def __init__(self, flush_interval=CATALOG_FLUSH_INTERVAL):
+        self.app = None
+        self.flush_interval = flush_interval
+        self._pending = {}  # (site, url) → product row values; the newest sighting wins
+        self._lock = threading.Lock()
+        self._timer = None
+        self._last_prune = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+        self.dropped = 0
+        self._failed_flushes = 0
+        atexit.register(self.flush)
+
+    def init_app(self, app):
+        self.app = app
+
+    @property
+    def enabled(self):
+        return CATALOG_ENABLED and self.app is not None
+
+    # ---------- writes ----------
+
+    def record(self, results):
+        """Queue every Product of scrape results ([{"site", "data", "candidates"}]) for the catalog."""
+        if not self.enabled:
+            return
+        now = utcnow()
+        with self._lock:
+            for block in results or []:
+                site = block.get("site")
+                for product in block.get("candidates") or block.get("data", []):
+                    url, name = product.url, (product.name or "").strip()
+                    if not (site and url and name):
+                        continue
+                    self._pending[(site, url)] = {
+                        "site": site,
+                        "name": name[:500],
+                        "price_minor": product.price_minor,
+                        "currency": product.currency,
+                        "price_text": product.price_text[:100] if product.price_text is not None else None,
+                        "rating": product.rating,
+                        "url": url[:1000],
+                        "image": (product.image or "")[:1000] or None,
+                        "scraped_at": now
+                    }
+            if self._pending and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Upsert queued products in one transaction. On failure they are queued again for the
+        next flush, until CATALOG_MAX_FAILED_FLUSHES flushes in a row have failed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending or self.app is None:
+            return
+
+        with self.app.app_context():
+            try:
+                self._upsert(pending)
+                self._prune()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self._failed_flushes += 1
+                    if self._failed_flushes >= CATALOG_MAX_FAILED_FLUSHES:
+                        # The database is down for good; stop carrying an ever-growing backlog
+                        self._failed_flushes = 0
+                        self.dropped += len(pending)
+                        keep = False
+                    else:
+                        # Sightings recorded since this flush started are newer, so they win
+                        self._pending = {**pending, **self._pending}
+                        keep = True
+                if keep:
+                    print(f"[CATALOG] ⚠️ Could not store products, keeping {len(pending)} for the next flush: {e}")
+                else:
+                    print(f"[CATALOG] 🗑️ Could not store products after {CATALOG_MAX_FAILED_FLUSHES} attempts, "
+                          f"dropping {len(pending)}: {e}")
+                return
+        with self._lock:
+            self._failed_flushes = 0
+        self.written += len(pending)
+        print(f"[CATALOG] 💾 Stored {len(pending)} products")
+
+    def _upsert(self, pending):
+        """INSERT ... ON CONFLICT (site, url) DO UPDATE, so concurrent workers writing the same product can't collide."""
+        insert = UPSERT_INSERTS.get(db.engine.dialect.name)
+        if insert is None:
+            self._write_rows(pending)
+            return
+        rows = list(pending.values())
+        for i in range(0, len(rows), CATALOG_UPSERT_CHUNK):
+            statement = insert(ScrapedProduct.__table__).values(rows[i:i + CATALOG_UPSERT_CHUNK])
+            statement = statement.on_conflict_do_update(
+                index_elements=["site", "url"],
+                set_={column: statement.excluded[column] for column in UPSERT_COLUMNS}
+            )
+            db.session.execute(statement)
+
+    def _write_rows(self, pending):
+        urls = {url for _, url in pending}
+        existing = {
+            (row.site, row.url): row
+            for row in ScrapedProduct.query.filter(ScrapedProduct.url.in_(urls))
+        }
+        for key, values in pending.items():
+            row = existing.get(key)
+            if row is None:
+                db.session.add(ScrapedProduct(**values))
+            else:
+                for field, value in values.items():
+                    setattr(row, field, value)
+
+    def _prune(self):
+        if time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        cutoff = utcnow() - timedelta(days=CATALOG_RETENTION_DAYS)
+        ScrapedProduct.query.filter(ScrapedProduct.scraped_at < cutoff).delete(synchronize_session=False)
+
+    # ---------- reads ----------
+
+    def search(self, query, sites=None, max_age=None, limit=200):
+        """Fresh ScrapedProduct rows matching every query term, best match first."""
+        terms = query_terms(query)
+        if not terms or not self.enabled:
+            return []
+        cutoff = utcnow() - timedelta(seconds=CATALOG_MAX_AGE if max_age is None else max_age)
+
+        with self.app.app_context():
+            ids = self._match_ids(terms, cutoff, sites, limit)
+            if not ids:
+                return []
+            rows = {row.id: row for row in ScrapedProduct.query.filter(ScrapedProduct.id.in_(ids))}
+            for row in rows.values():
+                db.session.expunge(row)  # Read after the context closes
+            return [rows[i] for i in ids if i in rows]
+
+    def search_blocks(self, query, site_keys, min_products, limit=None, min_sites=1):
+        """
+        [{"site", "data", "candidates"}] for the sites in site_keys, priority order
+        kept, that have at least min_products fresh matches, as long as min_sites
+        of them do; else None. data is the top `limit` of the ranked candidates.
+        """
+        if not self.enabled:
+            return None
+        try:
+            rows = self.search(query, sites=list(site_keys))
+        except Exception as e:
+            print(f"[CATALOG] ⚠️ Search failed, scraping instead: {e}")
+            return None
+
+        by_site = {}
+        for row in rows:
+            by_site.setdefault(row.site, []).append(product_from_row(row))
+
+        blocks = []
+        for site in site_keys:
+            products = rank_products(query, by_site.get(site, []))
+            if len(products) < min_products:
+                continue
+            blocks.append({"site": site, "data": products[:limit or min_products], "candidates": products})
+
+        if len(blocks) < min_sites:
+            self.misses += 1
+            return None
+        self.hits += 1
+        print(f"[CATALOG] ⚡ Answered '{query}' from the local catalog ({', '.join(b['site'] for b in blocks)})")
+        return blocks
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses,
+                "written": self.written, "dropped": self.dropped, "pending": pending}
+
+    def _match_ids(self, terms, cutoff, sites, limit):
+        dialect = db.engine.dialect.name
+        params = {"cutoff": cutoff, "limit": limit}
+        site_filter = ""
+        if sites:
+            names = [f"site_{i}" for i in range(len(sites))]
+            site_filter = f" AND p.site IN ({', '.join(':' + n for n in names)})"
+            params.update(zip(names, sites))
+
+        if dialect == "sqlite":
+            params["match"] = " AND ".join(f'"{term}"*' for term in terms)
+            sql = (f"SELECT p.id FROM {FTS_TABLE} f JOIN scraped_product p ON p.id = f.rowid "
+                   f"WHERE {FTS_TABLE} MATCH :match AND p.scraped_at >= :cutoff{site_filter} "
+                   f"ORDER BY f.rank LIMIT :limit")
+        elif dialect == "postgresql":
+            params["match"] = " & ".join(f"{term}:*" for term in terms)
+            sql = ("SELECT p.id FROM scraped_product p "
+                   "WHERE to_tsvector('simple', p.name) @@ to_tsquery('simple', :match) "
+                   f"AND p.scraped_at >= :cutoff{site_filter} "
+                   "ORDER BY ts_rank(to_tsvector('simple', p.name), to_tsquery('simple', :match)) DESC LIMIT :limit")
+        else:
+            for i, term in enumerate(terms):
+                params[f"term_{i}"] = f"%{term}%"
+            likes = " AND ".join(f"LOWER(p.name) LIKE :term_{i}" for i in range(len(terms)))
+            sql = (f"SELECT p.id FROM scraped_product p WHERE {likes} "
+                   f"AND p.scraped_at >= :cutoff{site_filter} ORDER BY p.scraped_at DESC LIMIT :limit")
+
+        return [row[0] for row in db.session.execute(text(sql), params)]
+
+
+def product_from_row(row):
+    """A catalog row as the Product record the scrapers produce."""
+    return Product(
+        row.site, row.name, row.price_text, rating=row.rating, url=row.url, image=row.image,
+        price_minor=row.price_minor, currency=row.currency
+    )
+
+
+product_catalog = ProductCatalog()
@@ -1,33 +1,23 @@
 import os
-import json
 import re
 from pathlib import Path
+from suggest_index import SuggestIndex
+from category_store import CategoryStore
+from query_classifier import classify
+from product_catalog import product_catalog
 
 # ✅ Path to categories.json
 CATEGORIES_PATH = Path("static/data/categories.json")
 
-# Category keywords for classification
-CATEGORY_KEYWORDS = {
-    "phones": ["phone", "samsung", "iphone", "infinix", "xiaomi", "pixel", "tecno"],
-    "laptops": ["laptop", "macbook", "thinkpad", "notebook", "zenbook", "aspire", "rog"],
-    "fashion": ["shoe", "shirt", "bag", "sneaker", "suit", "t-shirt", "dress", "blazer"],
-    "electronics": ["tv", "television", "headphone", "speaker", "camera", "earbud", "powerbank", "drone"],
-    "home_appliances": ["fan", "microwave", "fridge", "air conditioner", "kettle", "freezer", "washing machine"],
-    "beauty": ["cream", "lotion", "serum", "lipstick", "mascara", "foundation", "balm"],
-    "gaming": ["playstation", "ps5", "xbox", "controller", "headset", "gaming"],
-    "groceries": ["milk", "milo", "tea", "indomie", "spaghetti", "cereal", "oil", "beverage"],
-    "baby_products": ["baby", "diaper", "infant", "stroller", "bottle", "lotion", "wipes"],
-    "sports": ["shoe", "sneaker", "jersey", "dumbbell", "tennis", "swim", "watch"],
-    "automotive": ["tyre", "battery", "oil", "filter", "engine", "wiper", "car"]
-}
+# 🗂️ In-memory catalog with batched, atomic, cross-process-locked writes
+category_store = CategoryStore(CATEGORIES_PATH, flush_interval=float(os.getenv("CATEGORIES_FLUSH_INTERVAL", 5)))
 
+# 🔎 Prefix index behind /suggest, kept in step with categories.json
+suggest_index = SuggestIndex(CATEGORIES_PATH)
 
 def detect_category(product_name: str) -> str:
-    name = product_name.lower()
-    for cat, keywords in CATEGORY_KEYWORDS.items():
-        if any(word in name for word in keywords):
-            return cat
-    return "general"
+    """categories.json section for a product name (KEYWORD_CATEGORIES in query_classifier.py)."""
+    return classify(product_name).catalog_category
 
 
 def clean_product_name(raw_name: str) -> str:
@@ -59,17 +49,14 @@ def clean_product_name(raw_name: str) -> str:
 
 
 def update_categories_with_products(products: list):
-    if not CATEGORIES_PATH.exists():
-        print(f"[ERROR] categories.json not found at {CATEGORIES_PATH}")
-        return
-
-    with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-        categories = json.load(f)
-
+    """
+    Add cleaned product names to the category store. Duplicate checks are
+    O(1) set lookups; the file itself is written in the background.
+    """
     updated = False
 
     for product in products:
-        raw_name = product.get("name", "").strip()
+        raw_name = (product.name or "").strip()
         if not raw_name:
             continue
 
@@ -78,40 +65,38 @@ def update_categories_with_products(products: list):
             continue
 
         category = detect_category(clean_name)
-        if category not in categories:
-            categories[category] = []
 
         # Prevent duplicates (case-insensitive)
-        existing = [item.lower() for item in categories[category]]
-        if clean_name.lower() not in existing:
-            categories[category].append(clean_name)
+        if category_store.add(category, clean_name):
+            suggest_index.add(clean_name)
             updated = True
             print(f"[✅ ADDED] '{clean_name}' → {category}")
         else:
             print(f"[ℹ️] Skipped duplicate: {clean_name}")
 
     if updated:
-        with open(CATEGORIES_PATH, "w", encoding="utf-8") as f:
-            json.dump(categories, f, indent=2, ensure_ascii=False)
-        print("[💾] categories.json updated successfully.")
+        print("[💾] categories.json update queued.")
     else:
         print("[ℹ️] No new entries were added.")
 
 
 def extract_and_store_products(results: list):
     """
-    Extract product names from results and push to categories.json
+    Extract product names from results and push to categories.json;
+    the full products go to the local catalog (product_catalog.py).
     """
     if not results or not isinstance(results, list):
         print("[WARN] Invalid or empty results passed to extraction.")
         return
 
+    product_catalog.record(results)
+
     all_products = []
     for site_block in results:
         if not isinstance(site_block, dict):
             continue
         for item in site_block.get("data", []):
-            if "name" in item:
+            if item.name:
                 all_products.append(item)
 
     update_categories_with_products(all_products)
@@ -0,0 +1,44 @@
+# product_matching.py
+# Query matching, filtering and rating helpers shared by every extraction engine
+
+def normalize_text(text):
+    """Lower-cased with apostrophes dropped, so "women's" and "Womens" compare equal."""
+    return text.lower().replace("'", "").replace("’", "")
+
+
+#AJEBO
+def fuzzy_partial_match(query, name):
+    query = normalize_text(query)
+    name = normalize_text(name)
+    return query in name or any(word in name for word in query.split())
+
+
+
+def fuzzy_match(query, name):
+    return all(word in name.lower() for word in query.lower().split())
+
+
+#Function to give a definate product return and filter out unecessary product not searched
+UNWANTED_KEYWORDS = {"case", "cover", "protector", "screen", "glass"}
+
+def is_relevant_product(query, name):
+    if not fuzzy_match(query, name):
+        return False
+    name_lower = name.lower()
+    return not any(bad in name_lower for bad in UNWANTED_KEYWORDS)
+
+
+# Keywords to exclude accessories, cases, chargers, etc. (Jumia)
+EXCLUSION_KEYWORDS = ["case", "cover", "screen", "protector", "charger", "cable", "adapter", "glass", "earpiece", "battery", "strap"]
+
+def is_excluded(name, keywords=EXCLUSION_KEYWORDS):
+    return any(ex_kw.lower() in name.lower() for ex_kw in keywords)
+
+
+def stars_from_style(style):
+    """Convert a Jumia star bar style ('width:84%') to a 0-5 rating, or None."""
+    if style and "width" in style:
+        width_percent = float(style.split("width:")[1].replace("%", "").strip())
+        return round((width_percent / 100) * 5, 1)
+    return None
+
@@ -0,0 +1,145 @@
+# provider_budget.py
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from provider_health import ProviderUnavailable
+from utils import env_number, file_lock, write_json_atomic
+
+# Shared by every gunicorn worker on the host
+BUDGET_PATH = os.getenv("PROVIDER_BUDGET_PATH", os.path.join(tempfile.gettempdir(), "ace_provider_budget.json"))
+
+# Token bucket per provider: sustained calls/second and burst size
+DEFAULT_RATE = float(os.getenv("PROVIDER_RATE", 2))
+DEFAULT_BURST = float(os.getenv("PROVIDER_BURST", 10))
+
+# Credits charged per call: rendered (JS) requests cost more on every provider
+CREDIT_COSTS = {
+    "scraperapi": {"base": 1, "render": 10, "render_param": "render"},
+    "scrapingbee": {"base": 1, "render": 5, "render_param": "render_js"},
+    "scrapingdog": {"base": 1, "render": 5, "render_param": "dynamic"},
+    "zenrows": {"base": 1, "render": 5, "render_param": "js_render"}
+}
+
+
+class BudgetExceeded(ProviderUnavailable):
+    """Raised instead of calling a provider that is over its rate limit or credit budget."""
+
+
+def provider_limits(provider):
+    """(rate per second, burst, monthly credits or 0 for unlimited), overridable per provider."""
+    suffix = provider.upper()
+    return (
+        env_number(f"PROVIDER_RATE_{suffix}", DEFAULT_RATE),
+        env_number(f"PROVIDER_BURST_{suffix}", DEFAULT_BURST),
+        env_number(f"PROVIDER_CREDITS_{suffix}", 0)
+    )
+
+
+def credit_cost(provider, params=None):
+    costs = CREDIT_COSTS.get(provider)
+    if costs is None:
+        return 1
+    rendered = str((params or {}).get(costs["render_param"], "")).lower() == "true"
+    return costs["render"] if rendered else costs["base"]
+
+
+def current_period():
+    return time.strftime("%Y-%m", time.gmtime())
+
+
+class ProviderBudget:
+    """
+    Token-bucket rate limits and monthly credit accounting per provider.
+
+    State lives in one JSON file guarded by an exclusive flock, so every
+    worker on the host draws from the same buckets. acquire() never waits:
+    callers over the limit get False and are expected to degrade.
+    """
+
+    def __init__(self, path=BUDGET_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.rejected = {}
+
+    def acquire(self, provider, cost=1):
+        """Take one call (and `cost` credits) from a provider's budget. Returns False if over a limit."""
+        rate, burst, credits = provider_limits(provider)
+        now = time.time()
+        period = current_period()
+
+        try:
+            with self._locked_state() as state:
+                entry = state.setdefault(provider, {"tokens": burst, "updated": now, "period": period, "credits_used": 0})
+                if entry["period"] != period:
+                    entry["period"] = period
+                    entry["credits_used"] = 0
+
+                entry["tokens"] = min(burst, entry["tokens"] + (now - entry["updated"]) * rate)
+                entry["updated"] = now
+
+                if entry["tokens"] < 1:
+                    reason = "rate limit"
+                elif credits and entry["credits_used"] + cost > credits:
+                    reason = "credit budget"
+                else:
+                    entry["tokens"] -= 1
+                    entry["credits_used"] += cost
+                    return True
+        except OSError as e:
+            # A broken state file must not take scraping down with it
+            print(f"[WARN] Provider budget unavailable ({e}); allowing call")
+            return True
+
+        self.rejected[provider] = self.rejected.get(provider, 0) + 1
+        print(f"[BUDGET] 🚦 {provider} over its {reason}; degrading")
+        return False
+
+    def snapshot(self):
+        """Budget usage per provider for the internal endpoint."""
+        try:
+            with self._locked_state(write=False) as state:
+                state = dict(state)
+        except (OSError, ValueError):
+            state = {}
+
+        now = time.time()
+        report = {}
+        for provider in sorted(set(CREDIT_COSTS) | set(state)):
+            rate, burst, credits = provider_limits(provider)
+            entry = state.get(provider, {})
+            tokens = min(burst, entry.get("tokens", burst) + (now - entry.get("updated", now)) * rate)
+            used = entry.get("credits_used", 0) if entry.get("period") == current_period() else 0
+            report[provider] = {
+                "rate_per_sec": rate,
+                "burst": burst,
+                "tokens": round(tokens, 2),
+                "period": current_period(),
+                "credits_used": used,
+                "credits_budget": credits or None,
+                "credits_left": (credits - used) if credits else None,
+                "rejected_here": self.rejected.get(provider, 0)
+            }
+        return report
+
+    @contextmanager
+    def _locked_state(self, write=True):
+        with self._lock, file_lock(self.path):
+            state = self._read()
+            yield state
+            if write:
+                write_json_atomic(self.path, state)
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            return {}  # Corrupt file: start the buckets over rather than failing every fetch
+
+
+provider_budget = ProviderBudget()
@@ -0,0 +1,161 @@
+# provider_health.py
+import os
+import threading
+import time
+from collections import deque
+import requests
+
+# Rolling window of recent calls per provider
+HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", 100))
+# Breaker trips after this many consecutive failures...
+BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", 5))
+# ...or when at least this share of the last BREAKER_MIN_CALLS calls failed
+BREAKER_ERROR_RATE = float(os.getenv("PROVIDER_BREAKER_ERROR_RATE", 0.5))
+BREAKER_MIN_CALLS = int(os.getenv("PROVIDER_BREAKER_MIN_CALLS", 20))
+# Seconds an open breaker rejects calls before letting one trial through
+BREAKER_COOLDOWN = float(os.getenv("PROVIDER_BREAKER_COOLDOWN", 60))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class ProviderUnavailable(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+def is_provider_failure(status_code):
+    """Whether a response counts against the provider: throttling (429) or a server error (5xx).
+    Other 4xx (a missing ASIN, a bad target URL) say nothing about the provider's health."""
+    return status_code == 429 or status_code >= 500
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class ProviderHealth:
+    """Latency/error window and circuit breaker for one scraping provider."""
+
+    def __init__(self, name, window=HEALTH_WINDOW):
+        self.name = name
+        self._calls = deque(maxlen=window)  # (latency_seconds, ok)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self.total = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def allow(self):
+        """Whether a call may go out now. Half-open lets a single trial call through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def available(self):
+        """Like allow(), but without claiming the half-open trial (for ranking candidates)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= BREAKER_COOLDOWN
+            return not self._trial_in_flight
+
+    def release(self):
+        """Give back a claimed half-open trial when the call never went out (e.g. over budget)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record(self, latency, ok):
+        with self._lock:
+            self._calls.append((latency, ok))
+            self.total += 1
+            if ok:
+                self.consecutive_failures = 0
+                if self.state != CLOSED:
+                    print(f"[HEALTH] ✅ {self.name} recovered, closing breaker")
+                self.state = CLOSED
+                self._trial_in_flight = False
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self._should_trip():
+                self._open()
+
+    def latency_percentile(self, pct, min_samples=1):
+        """Latency percentile of successful calls in the window, or None with too few samples."""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._calls if ok)
+        if len(latencies) < min_samples:
+            return None
+        return percentile(latencies, pct)
+
+    def error_rate(self):
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(1 for _, ok in self._calls if not ok) / len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._calls if ok)
+            failed = sum(1 for _, ok in self._calls if not ok)
+            window = len(self._calls)
+            return {
+                "state": self.state,
+                "window": window,
+                "error_rate": round(failed / window, 3) if window else 0.0,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "total": self.total,
+                "failures": self.failures,
+                "rejected": self.rejected
+            }
+
+    def _should_trip(self):
+        if self.consecutive_failures >= BREAKER_FAILURES:
+            return True
+        recent = list(self._calls)[-BREAKER_MIN_CALLS:]
+        if len(recent) < BREAKER_MIN_CALLS:
+            return False
+        return sum(1 for _, ok in recent if not ok) / len(recent) >= BREAKER_ERROR_RATE
+
+    def _open(self):
+        if self.state != OPEN:
+            print(f"[HEALTH] 🔌 {self.name} breaker open for {BREAKER_COOLDOWN:.0f}s "
+                  f"({self.consecutive_failures} consecutive failures)")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def health(provider):
+    """The shared ProviderHealth for a provider, created on first use."""
+    tracker = _health.get(provider)
+    if tracker is None:
+        with _health_lock:
+            tracker = _health.setdefault(provider, ProviderHealth(provider))
+    return tracker
+
+
+def snapshot():
+    return {name: tracker.stats() for name, tracker in sorted(_health.items())}
@@ -0,0 +1,141 @@
+# provider_router.py
+# 🔀 Picks the scraping provider for a page fetch: preferred order per site, skipping
+# providers without a key or with an open breaker, failing over on errors and hedging
+# a slow request to the next provider once it runs past that provider's usual latency.
+# Transient failures (429/5xx/timeouts) are retried on the same provider by retry_policy first.
+import os
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+import http_client
+from provider_health import health
+from response_store import response_store
+from retry_policy import RetryPolicy, retry_scheduler, remaining_time
+
+# How each provider takes the target page (API key env var, key param name, render params)
+PROVIDER_PARAMS = {
+    "scraperapi": {
+        "key_env": "scraper_api",
+        "key_param": "api_key",
+        "params": {"render": "true", "autoparse": "false", "country_code": "ng", "device_type": "desktop"}
+    },
+    "scrapingbee": {"key_env": "scraping_bee_api", "key_param": "api_key", "params": {"render_js": "true"}},
+    "scrapingdog": {"key_env": "scraping_dog_api", "key_param": "api_key", "params": {"dynamic": "true"}},
+    "zenrows": {"key_env": "zenrow_scraper_api", "key_param": "apikey", "params": {"js_render": "true"}}
+}
+
+# Provider preference per site; the first one is the site's usual provider
+SITE_PROVIDERS = {
+    "jumia": ["scrapingbee", "scraperapi", "zenrows"],
+    "ajebomarket": ["scrapingdog", "scraperapi", "zenrows"],
+    "slot": ["zenrows", "scraperapi", "scrapingbee"]
+}
+DEFAULT_PROVIDERS = ["scraperapi", "scrapingbee", "zenrows", "scrapingdog"]
+
+# Extra params for one site on one provider
+SITE_PARAMS = {
+    ("slot", "zenrows"): {"wait_for": ".products"}
+}
+
+# Providers tried per page (primary + failovers/hedges)
+ROUTER_MAX_ATTEMPTS = int(os.getenv("PROVIDER_MAX_ATTEMPTS", 2))
+# Hedge a slow request to the next provider ("0" disables)
+HEDGING_ENABLED = os.getenv("PROVIDER_HEDGING", "1") != "0"
+# Hedge delay: the primary's p90 latency once it has HEDGE_MIN_SAMPLES successes, else HEDGE_AFTER
+HEDGE_AFTER = float(os.getenv("PROVIDER_HEDGE_AFTER", 25))
+HEDGE_MIN_DELAY = float(os.getenv("PROVIDER_HEDGE_MIN_DELAY", 5))
+HEDGE_MIN_SAMPLES = 20
+# Attempts on one provider before failing over; failover and hedging cover the rest
+ROUTER_RETRY_POLICY = RetryPolicy(max_attempts=int(os.getenv("PROVIDER_RETRY_ATTEMPTS", 2)))
+
+
+def api_key(provider):
+    return os.getenv(PROVIDER_PARAMS[provider]["key_env"])
+
+
+def build_params(provider, site, url):
+    spec = PROVIDER_PARAMS[provider]
+    params = {spec["key_param"]: api_key(provider), "url": url, **spec["params"]}
+    params.update(SITE_PARAMS.get((site, provider), {}))
+    return params
+
+
+def candidates(site):
+    """Configured providers for a site in preference order, open breakers left out."""
+    preferred = SITE_PROVIDERS.get(site, DEFAULT_PROVIDERS)
+    # Replay serves recorded responses, so a missing key doesn't rule a provider out
+    configured = preferred if response_store.replay_only else [p for p in preferred if api_key(p)]
+    return [p for p in configured if health(p).available()]
+
+
+def hedge_delay(provider):
+    p90 = health(provider).latency_percentile(90, min_samples=HEDGE_MIN_SAMPLES)
+    return max(HEDGE_MIN_DELAY, p90 if p90 is not None else HEDGE_AFTER)
+
+
+def _attempt(provider, site, url):
+    """Future for one provider's call (with retries) on the request's pool; resolves to the last response or error."""
+    params = build_params(provider, site, url)
+    return retry_scheduler.submit(
+        lambda: http_client.get(provider, params=params, headers=http_client.DEFAULT_HEADERS),
+        policy=ROUTER_RETRY_POLICY, label=f"{provider}/{site}"
+    )
+
+
+def fetch_page(site, url, max_attempts=None, hedging=None):
+    """
+    Fetch a site page through the best available provider.
+    Returns (provider, response) for the first 200 response, or (None, None).
+    """
+    remaining = candidates(site)[:max_attempts or ROUTER_MAX_ATTEMPTS]
+    if not remaining:
+        print(f"[ROUTER] ⚠️ No provider available for {site} (no key or breaker open)")
+        return None, None
+
+    hedging = HEDGING_ENABLED if hedging is None else hedging
+    pending = {}
+
+    def launch():
+        provider = remaining.pop(0)
+        pending[_attempt(provider, site, url)] = (provider, time.monotonic())
+
+    launch()
+    while pending:
+        timeout, hedge_due = None, False
+        if hedging and remaining:
+            primary, started = next(iter(pending.values()))
+            timeout, hedge_due = max(0.0, started + hedge_delay(primary) - time.monotonic()), True
+        left = remaining_time()
+        if left is not None and (timeout is None or left < timeout):
+            timeout, hedge_due = max(0.0, left), False
+
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done and not hedge_due:
+            print(f"[ROUTER] ⏱️ Deadline reached fetching {site}")
+            for future in pending:
+                future.cancel()
+            return None, None
+        if not done:
+            print(f"[ROUTER] 🐢 {primary} slow for {site}, hedging to {remaining[0]}")
+            launch()
+            continue
+
+        for future in done:
+            provider, _ = pending.pop(future)
+            error = future.exception()
+            if error is not None:
+                print(f"[ROUTER] ❌ {provider} failed for {site}: {error}")
+                continue
+            response = future.result()
+            if response.status_code == 200:
+                if pending:
+                    print(f"[ROUTER] 🏁 {provider} won the hedge for {site}")
+                    for loser in pending:
+                        loser.cancel()  # Stop the loser's pending retries
+                return provider, response
+            print(f"[ROUTER] ❌ {provider} returned {response.status_code} for {site}")
+
+        # Fail over straight away instead of waiting on a hedge timer
+        if remaining and not pending:
+            launch()
+
+    return None, None
@@ -0,0 +1,122 @@
+# query_classifier.py
+# 🧭 One compiled matcher for every keyword lookup on a query: routing category
+# (→ PRODUCT_PRIORITY sites) and catalog category (categories.json), both read from
+# the single KEYWORD_CATEGORIES table, plus the fetch trigger.
+import re
+from functools import lru_cache
+
+# Category → site keys to try, in order (non-ratings searches)
+PRODUCT_PRIORITY = {
+    "fashion": ["ajebomarket", "konga", "jiji"],
+    "electronics": ["slot", "kara", "topsuccess", "jiji"],
+    "phones & tablets": ["slot", "kara", "jiji"],
+    "appliances": ["kara", "topsuccess", "jiji"],
+    "health & beauty": ["konga", "jiji"],
+    "home & office": ["kara", "konga", "topsuccess", "jiji"],
+    "supermarket": ["konga", "jiji"],
+    "computing": ["slot", "kara", "jiji"],
+    "baby products": ["konga", "jiji"],
+    "gaming": ["kara", "jiji"],
+    "musical instruments": ["kara", "jiji"],
+    "general": ["konga", "slot", "kara", "topsuccess", "ajebomarket", "jiji"]
+}
+
+# The one keyword table behind both category lookups. Each keyword is listed once, under
+# (routing category → PRODUCT_PRIORITY, categories.json section); None means the row doesn't
+# vote in that lookup. When a text matches several rows, the earliest label wins in each.
+KEYWORD_CATEGORIES = [
+    ("phones & tablets", "phones", ["phone", "iphone", "android", "tablet", "ipad", "smartphone"]),
+    ("computing", "laptops", ["laptop", "macbook", "thinkpad", "notebook", "zenbook", "aspire", "rog"]),
+    ("fashion", "fashion", ["shirt", "t-shirt", "jeans", "trouser", "dress", "shoe", "sneaker", "wear",
+                            "jacket", "cap", "bag", "handbag", "suit", "blazer", "scarf"]),
+    ("electronics", "electronics", ["tv", "television", "monitor", "camera", "speaker", "bluetooth", "dvd",
+                                    "decoder", "headphone", "earbud", "powerbank", "drone"]),
+    ("appliances", "home_appliances", ["fridge", "refrigerator", "microwave", "freezer", "ac", "air conditioner",
+                                       "fan", "cooker", "blender", "washing machine", "dishwasher", "kettle"]),
+    ("health & beauty", "beauty", ["cream", "lotion", "soap", "shampoo", "toothpaste", "perfume", "skincare",
+                                   "serum", "lipstick", "mascara", "foundation", "balm"]),
+    ("gaming", "gaming", ["console", "playstation", "ps5", "xbox", "gamepad", "controller", "joystick",
+                          "headset", "gaming"]),
+    ("supermarket", "groceries", ["milk", "milo", "rice", "noodles", "indomie", "spaghetti", "cereal", "biscuit",
+                                  "sugar", "beverage", "tea", "juice", "oil"]),
+    ("baby products", "baby_products", ["baby", "babybjörn", "infant", "diaper", "stroller", "wipes", "feeder", "bottle"]),
+    ("computing", None, ["keyboard", "mouse", "cpu", "ram", "ssd", "hard disk", "computer", "desktop", "pc"]),
+    ("home & office", None, ["sofa", "desk", "chair", "bed", "lamp", "cabinet", "table", "mattress"]),
+    ("musical instruments", None, ["guitar", "drum", "piano", "microphone", "violin"]),
+    # Phone brands only decide when no product type matched ("samsung tv" is a TV)
+    ("phones & tablets", "phones", ["samsung", "infinix", "xiaomi", "pixel", "tecno"]),
+    (None, "sports", ["jersey", "dumbbell", "tennis", "swim", "watch", "smartwatch"]),
+    (None, "automotive", ["tyre", "battery", "filter", "engine", "wiper", "car"])
+]
+
+
+def _rows(column):
+    """[(label, keywords)] for one column of KEYWORD_CATEGORIES, rows that don't vote in it left out."""
+    return [(row[column], row[2]) for row in KEYWORD_CATEGORIES if row[column] is not None]
+
+
+# Fetch site → explicit fetch phrases (rating sites only; first site wins)
+FETCH_PHRASES = {
+    "jumia": ["fetch from jumia", "get it from jumia", "search from jumia"],
+    "amazon": ["fetch from amazon", "get it from amazon", "search from amazon"]
+}
+
+# table → [(label, keywords)]; a row's position is its precedence
+TABLES = (("routing", _rows(0)), ("catalog", _rows(1)), ("fetch", list(FETCH_PHRASES.items())))
+
+
+class Classification:
+    """Routing category with its site priority, catalog category and fetch site for one text."""
+
+    __slots__ = ("category", "priority", "catalog_category", "fetch_site")
+
+    def __init__(self, category, priority, catalog_category, fetch_site):
+        self.category = category
+        self.priority = priority
+        self.catalog_category = catalog_category
+        self.fetch_site = fetch_site
+
+    def __repr__(self):
+        return (f"Classification(category={self.category!r}, catalog_category={self.catalog_category!r}, "
+                f"fetch_site={self.fetch_site!r})")
+
+
+def _build_matcher():
+    # keyword → [(table, label rank)], so one match can vote in several tables
+    owners = {}
+    labels = {}
+    for table, rows in TABLES:
+        labels[table] = [label for label, _ in rows]
+        for rank, (_, keywords) in enumerate(rows):
+            for keyword in keywords:
+                owners.setdefault(keyword, []).append((table, rank))
+
+    # Longest first so "air conditioner" wins over "conditioner"-style prefixes.
+    # Keywords must start a word and may take a plural ("shoes", "boxes") or a
+    # model number ("ps5", "iphone11"), but not run into more letters ("ac" ≠ "black").
+    alternation = "|".join(re.escape(k) for k in sorted(owners, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![a-z0-9])({alternation})(?:e?s)?(?![a-z])")
+    return pattern, owners, labels
+
+
+MATCHER, KEYWORD_OWNERS, TABLE_LABELS = _build_matcher()
+
+
+def _best_ranks(text):
+    best = {}
+    for match in MATCHER.finditer(text):
+        for table, rank in KEYWORD_OWNERS[match.group(1)]:
+            if rank < best.get(table, len(TABLE_LABELS[table])):
+                best[table] = rank
+    return best
+
+
+@lru_cache(maxsize=4096)
+def classify(text):
+    """Classify a query or product name in one regex pass over every keyword table."""
+    best = _best_ranks(" ".join(text.lower().split()))
+
+    category = TABLE_LABELS["routing"][best["routing"]] if "routing" in best else "general"
+    catalog_category = TABLE_LABELS["catalog"][best["catalog"]] if "catalog" in best else "general"
+    fetch_site = TABLE_LABELS["fetch"][best["fetch"]] if "fetch" in best else None
+    return Classification(category, tuple(PRODUCT_PRIORITY[category]), catalog_category, fetch_site)
@@ -0,0 +1,118 @@
+# ranking.py
+# 📊 Cross-site product ranking: every candidate from every site is scored in one
+# NumPy pass over relevance, rating, price (cheapest within a currency) and site trust.
+# Ranking only orders: deciding what matches a query is the site matchers' (and Amazon search's) job.
+import os
+import numpy as np
+from product_matching import UNWANTED_KEYWORDS, normalize_text
+
+
+def _weight(name, default):
+    value = os.getenv(f"RANK_WEIGHT_{name.upper()}")
+    return float(value) if value else default
+
+
+# Score weights (normalized to sum to 1), overridable with RANK_WEIGHT_<FEATURE>
+RANK_WEIGHTS = {
+    "relevance": _weight("relevance", 0.45),
+    "rating": _weight("rating", 0.25),
+    "price": _weight("price", 0.15),
+    "trust": _weight("trust", 0.15)
+}
+FEATURES = ("relevance", "rating", "price", "trust")
+
+# How much we trust each marketplace's listings (fulfilment, returns, fake-listing risk)
+SITE_TRUST = {
+    "jumia": 0.9,
+    "amazon": 0.9,
+    "konga": 0.8,
+    "slot": 0.8,
+    "kara": 0.7,
+    "ajebomarket": 0.6,
+    "topsuccess": 0.6,
+    "jiji": 0.4
+}
+DEFAULT_TRUST = 0.5
+
+# Merged list size for /search-products
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", 12))
+# Rating feature for products without one (sites that show no ratings, unrated listings): 3 stars
+RANK_MISSING_RATING = float(os.getenv("RANK_MISSING_RATING", 0.6))
+# Relevance multiplier for accessories (cases, protectors...) when the query isn't for one
+ACCESSORY_PENALTY = float(os.getenv("RANK_ACCESSORY_PENALTY", 0.3))
+# Subtracted from the score of products whose name has none of the query words (they are kept, just ranked last)
+UNMATCHED_PENALTY = float(os.getenv("RANK_UNMATCHED_PENALTY", 0.5))
+
+
+def weight_vector(weights=None):
+    weights = {**RANK_WEIGHTS, **(weights or {})}
+    vector = np.array([weights[name] for name in FEATURES], dtype=np.float64)
+    total = vector.sum()
+    return vector / total if total > 0 else np.full(len(FEATURES), 1 / len(FEATURES))
+
+
+def feature_matrix(query, products):
+    """(n, 4) matrix of relevance, rating, price and trust features in [0, 1]."""
+    n = len(products)
+    terms = list(dict.fromkeys(normalize_text(query).split()))
+    accessories = [kw for kw in UNWANTED_KEYWORDS if kw not in terms]
+    vocabulary = terms + accessories
+    names = [normalize_text(p.name or "") for p in products]
+
+    # One substring pass builds the whole product × vocabulary hit matrix
+    hits = np.fromiter(
+        (word in name for name in names for word in vocabulary), dtype=bool, count=n * len(vocabulary)
+    ).reshape(n, len(vocabulary))
+    relevance = hits[:, :len(terms)].mean(axis=1) if terms else np.ones(n)
+    if accessories:
+        relevance = np.where(hits[:, len(terms):].any(axis=1), relevance * ACCESSORY_PENALTY, relevance)
+
+    # Jumia reports unrated listings as 0.0, so anything not positive counts as missing
+    ratings = np.array([p.rating if p.rating else np.nan for p in products], dtype=np.float64)
+    rating = np.where(np.isnan(ratings), RANK_MISSING_RATING, np.clip(ratings / 5.0, 0.0, 1.0))
+
+    prices = np.array([p.price_minor if p.price_minor else np.nan for p in products], dtype=np.float64)
+    currencies = np.array([p.currency or "" for p in products])
+    price = np.full(n, 0.5)
+    for currency in np.unique(currencies):
+        mask = (currencies == currency) & ~np.isnan(prices)
+        if mask.sum() < 2:
+            continue
+        # Log scale: ₦50k vs ₦100k matters as much as ₦500k vs ₦1m; cheapest → 1, dearest → 0
+        log_prices = np.log(prices[mask])
+        low, high = log_prices.min(), log_prices.max()
+        if high > low:
+            price[mask] = 1.0 - (log_prices - low) / (high - low)
+
+    trust = np.array([SITE_TRUST.get(p.site, DEFAULT_TRUST) for p in products], dtype=np.float64)
+    return np.column_stack((relevance, rating, price, trust))
+
+
+def score_products(query, products, weights=None):
+    """Weighted score per product; names with none of the query words lose UNMATCHED_PENALTY."""
+    if not products:
+        return np.empty(0)
+    features = feature_matrix(query, products)
+    scores = features @ weight_vector(weights)
+    return np.where(features[:, 0] > 0, scores, scores - UNMATCHED_PENALTY)
+
+
+def rank_products(query, products, top_k=None, weights=None):
+    """Every product, best first (ties keep their page order)."""
+    products = list(products)
+    scores = score_products(query, products, weights)
+    ranked = [products[i] for i in np.argsort(-scores, kind="stable")]
+    return ranked[:top_k] if top_k else ranked
+
+
+def rank_blocks(query, results, top_k=None, weights=None):
+    """One merged top-K list from site blocks, using each block's full candidate list when it has one."""
+    candidates = []
+    seen = set()
+    for block in results or []:
+        for product in block.get("candidates") or block.get("data", []):
+            key = (product.site, product.url)
+            if key not in seen:
+                seen.add(key)
+                candidates.append(product)
+    return rank_products(query, candidates, top_k=top_k or RANK_TOP_K, weights=weights)
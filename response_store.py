@@ -0,0 +1,196 @@
+# response_store.py
+import os
+import json
+import gzip
+import time
+import hashlib
+import tempfile
+import threading
+import requests
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 💾 Content-addressed, gzip-compressed store of raw proxy responses shared by all workers.
+#   off       → never read or write the store
+#   readwrite → serve fresh entries from disk, record every successful response
+#   replay    → serve only from disk (TTL ignored), never touch the network
+RESPONSE_STORE_MODE = os.getenv("RESPONSE_STORE_MODE", "readwrite").lower()
+RESPONSE_STORE_DIR = os.getenv("RESPONSE_STORE_DIR") or os.path.join(tempfile.gettempdir(), "ace_response_store")
+RESPONSE_STORE_TTL = int(os.getenv("RESPONSE_STORE_TTL", 900))
+# Oldest page still served when a provider is over its budget (see provider_budget.py)
+RESPONSE_STORE_STALE_TTL = int(os.getenv("RESPONSE_STORE_STALE_TTL", 24 * 3600))
+RESPONSE_STORE_MAX_BYTES = int(os.getenv("RESPONSE_STORE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Credentials never take part in the key, so every worker and every key rotation shares entries
+SECRET_PARAMS = {"api_key", "apikey"}
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class StoredResponse:
+    """Minimal stand-in for requests.Response, served from the store."""
+
+    status_code = 200
+    from_store = True
+
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.headers = {}
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def redact_url(url):
+    """url without SECRET_PARAMS in its query string."""
+    parts = urlsplit(url or "")
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def store_key(provider, url, params=None):
+    """Stable key for provider + target URL + render options (credentials excluded)."""
+    options = {k: str(v) for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    material = json.dumps([provider, url, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    def __init__(self, root=RESPONSE_STORE_DIR, mode=RESPONSE_STORE_MODE, ttl=RESPONSE_STORE_TTL, max_bytes=RESPONSE_STORE_MAX_BYTES):
+        self.root = root
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._bytes = None  # Lazily measured on first write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.mode in ("readwrite", "replay")
+
+    @property
+    def replay_only(self):
+        return self.mode == "replay"
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], key + ".json.gz")
+
+    def load(self, provider, url, params=None, max_age=None):
+        """
+        Return a StoredResponse for this request, or None if there is no usable entry.
+        max_age (seconds) overrides the TTL, e.g. to fall back on stale pages.
+        """
+        if not self.enabled:
+            return None
+
+        key = store_key(provider, url, params)
+        path = self.path_for(key)
+        max_age = self.ttl if max_age is None else max_age
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                record = json.load(f)
+
+            # Age comes from the record: mtime is bumped on every hit for LRU eviction
+            age = time.time() - record.get("stored_at", os.path.getmtime(path))
+            if not self.replay_only and age > max_age:
+                self.misses += 1
+                return None
+            os.utime(path, None)  # Bump recency for LRU eviction
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return StoredResponse(redact_url(record.get("url", url)), record["text"])
+
+    def save(self, provider, url, params, response):
+        """Record a successful response; failures are never stored."""
+        if self.mode != "readwrite" or response.status_code != 200:
+            return
+
+        key = store_key(provider, url, params)
+        path = self.path_for(key)
+        record = {
+            "provider": provider,
+            "url": redact_url(response.url),  # Proxy URLs carry the api_key
+            "target": url,
+            "options": {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+            "stored_at": time.time(),
+            "text": response.text
+        }
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers in other workers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Response store write failed: {e}")
+            return
+
+        with self._lock:
+            self.writes += 1
+            if self._bytes is None:
+                self._bytes = self._disk_usage()
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _disk_usage(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries until the store is back under 90% of its cap."""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions
+        }
+
+
+response_store = ResponseStore()
@@ -0,0 +1,246 @@
+# retry_policy.py
+# 🔁 One retry policy for every proxy fetch: retryable vs fatal outcomes, jittered
+# exponential backoff, Retry-After, and the request's remaining deadline.
+# Backoff waits live on a single scheduler thread, not on pool workers, and each request's
+# attempts run on that request's own pool (RequestScope) so one slow search can't starve the rest.
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from email.utils import parsedate_to_datetime
+import requests
+from provider_health import ProviderUnavailable
+from response_store import ReplayMiss
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 8))
+# Don't start an attempt with less than this much of the deadline left
+RETRY_MIN_ATTEMPT_TIME = float(os.getenv("RETRY_MIN_ATTEMPT_TIME", 5))
+# Fetch attempts one request runs at once (its sites, hedges and Amazon detail pages)
+REQUEST_FETCH_WORKERS = int(os.getenv("REQUEST_FETCH_WORKERS", 8))
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+OK, RETRY, FATAL = "ok", "retry", "fatal"
+
+# Absolute time.monotonic() by which the current request must finish (None: no deadline)
+request_deadline = contextvars.ContextVar("request_deadline", default=None)
+# Pool that runs the current request's fetch attempts (None: the scheduler's shared pool)
+request_executor = contextvars.ContextVar("request_executor", default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request's deadline ran out before (another) attempt could start."""
+
+
+def remaining_time():
+    """Seconds left before the current request's deadline, or None without one."""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def result_by_deadline(future):
+    """future.result(), waiting no longer than the current request's remaining deadline."""
+    left = remaining_time()
+    try:
+        return future.result(timeout=None if left is None else max(0.0, left))
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded("Deadline reached waiting for a fetch") from None
+
+
+class RequestScope:
+    """
+    One request's deadline and fetch pool. Code called through run() sees both,
+    so its retry_scheduler attempts queue only behind this request's own
+    attempts; close() drops the attempts and retries nobody is waiting for.
+    """
+
+    def __init__(self, timeout, max_workers=REQUEST_FETCH_WORKERS):
+        self.deadline_at = time.monotonic() + timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn inside the scope (executor threads don't inherit context, so scrape workers go through here)."""
+        deadline_token = request_deadline.set(self.deadline_at)
+        executor_token = request_executor.set(self.executor)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            request_executor.reset(executor_token)
+            request_deadline.reset(deadline_token)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def retry_after_seconds(response):
+    """Retry-After as seconds (delta or HTTP date), or None."""
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(response=None, error=None):
+    """OK, RETRY or FATAL for one attempt's response or exception."""
+    if error is not None:
+        # Breakers, budgets (BudgetExceeded) and replay misses are decisions, not transient failures
+        if isinstance(error, (ProviderUnavailable, ReplayMiss, DeadlineExceeded)):
+            return FATAL
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                              requests.exceptions.ChunkedEncodingError)):
+            return RETRY
+        return FATAL
+    if response.status_code == 200:
+        return OK
+    return RETRY if response.status_code in RETRYABLE_STATUS else FATAL
+
+
+class RetryPolicy:
+    """Attempt limits and full-jitter exponential backoff, bounded by the request deadline."""
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 min_attempt_time=RETRY_MIN_ATTEMPT_TIME):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_time = min_attempt_time
+
+    def backoff(self, attempt, response=None):
+        """Delay before attempt number `attempt + 1`; honours Retry-After when the server sends one."""
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def next_delay(self, attempt, outcome, response=None, deadline=None):
+        """Seconds to wait before retrying, or None to stop."""
+        if outcome != RETRY or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, response)
+        if deadline is not None and time.monotonic() + delay + self.min_attempt_time > deadline:
+            return None
+        return delay
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class RetryScheduler:
+    """
+    Runs attempts on the request's pool (see RequestScope) and parks backoff
+    waits on one timer thread, so no worker sleeps between attempts. submit()
+    returns a Future with the final response (the last one, even if it was a
+    failure) or exception; cancelling it stops any retries still to come.
+    Callers wait on it with result_by_deadline(), never past the deadline.
+    """
+
+    def __init__(self, max_workers=8):
+        # Only for calls made outside a RequestScope (benchmarks, scripts)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retry")
+        self._queue = []  # (due, seq, callback)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+
+    def submit(self, fn, policy=DEFAULT_POLICY, label="fetch"):
+        future = Future()
+        context = contextvars.copy_context()
+        deadline = context.get(request_deadline)
+        executor = context.get(request_executor) or self._executor
+
+        def settle(response=None, error=None):
+            try:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(response)
+            except InvalidStateError:
+                pass  # Cancelled by the caller while the last attempt ran
+
+        def start(number):
+            try:
+                task = executor.submit(attempt, number)
+            except RuntimeError:  # The request's scope closed; nobody is waiting any more
+                settle(error=DeadlineExceeded(f"{label}: request finished before attempt {number}"))
+                return
+            task.add_done_callback(
+                lambda t: t.cancelled() and settle(error=DeadlineExceeded(f"{label}: request finished"))
+            )
+
+        def attempt(number):
+            if future.cancelled():
+                return
+            response, error = None, None
+            try:
+                response = context.run(fn)
+            except Exception as e:
+                error = e
+            outcome = classify(response, error)
+            delay = policy.next_delay(number, outcome, response, deadline)
+
+            if delay is None:
+                if outcome == RETRY:
+                    with self._stats_lock:
+                        self.gave_up += 1
+                settle(response, error)
+                return
+
+            with self._stats_lock:
+                self.retries += 1
+            reason = error or f"HTTP {response.status_code}"
+            print(f"[RETRY] 🔁 {label} attempt {number} failed ({reason}); retrying in {delay:.1f}s")
+            self._schedule(delay, lambda: start(number + 1))
+
+        start(1)
+        return future
+
+    def stats(self):
+        with self._cond:
+            scheduled = len(self._queue)
+        return {"scheduled": scheduled, "retries": self.retries, "gave_up": self.gave_up}
+
+    def _schedule(self, delay, callback):
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._seq), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="retry-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._cond.wait(timeout)
+                _, _, callback = heapq.heappop(self._queue)
+            try:
+                callback()
+            except Exception as e:
+                print(f"[RETRY] ⚠️ Could not schedule retry: {e}")
+
+
+retry_scheduler = RetryScheduler(max_workers=int(os.getenv("RETRY_MAX_WORKERS", 8)))
@@ -1,41 +1,59 @@
 # scrap_global.py
-import requests
-import os
+import provider_router
+from retry_policy import RequestScope
+from scrape_engine import SCRAPE_DEADLINE
+from search_refresh import search_refresher
+from product_catalog import product_catalog
 from product_extraction import extract_and_store_products
 from scrap_local import (
-    RATING_SITES,
-    NON_RATING_SITES,
-    extract_jumia_data,
+    EXTRACTOR_MAP,
     extract_amazon_data,
-    extract_konga_data,
-    extract_slot_data,
-    extract_kara_data,
-    extract_ajebomarket_data,
-    extract_topsuccess_data,
-    extract_jiji_data,
-    fetch_with_retry,
-    SCRAPER_API_KEY
+    search_url,
+    generate_cache_key,
+    memory_cache,
+    search_flights,
+    flight_key
 )
 
-EXTRACTOR_MAP = {
-    "jumia": extract_jumia_data,
-    "amazon": extract_amazon_data,
-    "konga": extract_konga_data,
-    "slot": extract_slot_data,
-    "kara": extract_kara_data,
-    "ajebomarket": extract_ajebomarket_data,
-    "topsuccess": extract_topsuccess_data,
-    "jiji": extract_jiji_data
-}
-
-ALL_SITES = {**RATING_SITES, **NON_RATING_SITES}
 
 def try_single_site_scrape(product_query, site):
-    from product_extraction import extract_and_store_products  # Ensure it's imported
-    import os
-    import requests
+    # Unknown sites never reach the cache or the hot-query tracker
+    if site not in EXTRACTOR_MAP:
+        print(f"[ERROR] ❌ Unsupported site: {site}")
+        return []
+
+    cache_key = generate_cache_key(f"site:{site}:{product_query}")
+
+    def scrape_and_cache():
+        # Same whole-request budget as a multi-site search, so retries can't run past it
+        with RequestScope(SCRAPE_DEADLINE) as scope:
+            result_data = scope.run(scrape_single_site, product_query, site)
+        # A failed refresh must not replace the stale result still being served
+        if result_data or memory_cache.peek(cache_key)[0] is None:
+            memory_cache.set(cache_key, result_data)
+        return result_data
+
+    def scrape():
+        # Concurrent requests for the same site and query share one scrape
+        return search_flights.do(flight_key(product_query, "site", site), scrape_and_cache)
 
-    if site not in ALL_SITES or site not in EXTRACTOR_MAP:
+    search_refresher.touch(cache_key, f"{site}:{product_query}", scrape)
+    cached, stale = memory_cache.get_with_state(cache_key)
+    if cached is not None:
+        if stale:
+            search_refresher.revalidate(cache_key, f"{site}:{product_query}", scrape)
+        print(f"[CACHE] ⚡ Serving {site} results for '{product_query}' from cache{' (stale)' if stale else ''}")
+        return cached
+
+    catalog = product_catalog.search_blocks(product_query, [site], min_products=2, limit=4)
+    if catalog:
+        return catalog
+
+    return scrape()
+
+
+def scrape_single_site(product_query, site):
+    if site not in EXTRACTOR_MAP:
         print(f"[ERROR] ❌ Unsupported site: {site}")
         return []
 
@@ -47,7 +65,8 @@ def try_single_site_scrape(product_query, site):
         products = extract_amazon_data(None, product_query)
         result_data = [{
             "site": "amazon",
-            "data": products
+            "data": products[:4],
+            "candidates": products
         }] if products else []
         extract_and_store_products(result_data)
         return result_data
@@ -63,49 +82,22 @@ def try_single_site_scrape(product_query, site):
             print(f"[INFO] ✅ Found {len(products)} products on {site}")
         result_data = [{
             "site": site,
-            "data": products[:4]
+            "data": products[:4],
+            "candidates": products
         }] if products else []
         extract_and_store_products(result_data)
         return result_data
 
-    # ✅ Jumia uses ScrapingBee
-    search_url = ALL_SITES[site] + product_query.replace(" ", "+")
-    print(f"[DEBUG] 🌐 Search URL: {search_url}")
-
-    if site == "jumia":
-        payload = {
-            "api_key": os.getenv("scraping_bee_api"),
-            "url": search_url,
-            "render_js": "true"
-        }
-        proxy_url = "https://app.scrapingbee.com/api/v1"
-
-    elif site == "ajebomarket":
-        payload = {
-            "api_key": os.getenv("scraping_dog_api"),
-            "url": search_url,
-            "dynamic": "true"
-        }
-        proxy_url = "https://api.scrapingdog.com/scrape"
-        
-    else:
-        payload = {
-            'api_key': SCRAPER_API_KEY,
-            'url': search_url,
-            'render': 'true',
-            'autoparse': 'false',
-            'country_code': 'ng',
-            'device_type': 'desktop'
-        }
-        proxy_url = "https://api.scraperapi.com/"
-
-    response = requests.get(proxy_url, params=payload, headers={"User-Agent": "Mozilla/5.0"})
-    print(f"[DEBUG] Attempt → Status: {response.status_code}")
-    print(f"[DEBUG] Final URL: {response.url}")
+    url = search_url(site, product_query)
+    print(f"[DEBUG] 🌐 Search URL: {url}")
 
-    if response.status_code != 200:
-        print(f"[ERROR] ❌ Non-200 response from {site}. Content:\n{response.text[:400]}")
+    # 🔀 ScrapingBee for Jumia, ScrapingDog for AjeboMarket, ScraperAPI otherwise; failover/hedging in the router
+    provider, response = provider_router.fetch_page(site, url)
+    if response is None:
+        print(f"[ERROR] ❌ No provider could fetch {site}")
         return []
+    print(f"[DEBUG] {provider} → Status: {response.status_code}")
+    print(f"[DEBUG] Final URL: {response.url}")
 
     html = response.text
     extractor = EXTRACTOR_MAP[site]
@@ -119,7 +111,8 @@ def try_single_site_scrape(product_query, site):
 
     result_data = [{
         "site": site,
-        "data": products[:4]
+        "data": products[:4],
+        "candidates": products
     }] if products else []
 
     extract_and_store_products(result_data)
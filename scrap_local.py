@@ -1,395 +1,146 @@
 # scrap_local.py
 import os
-import time
 import hashlib
 import requests
-import random
-from bs4 import BeautifulSoup
+import http_client
+import provider_router
+from retry_policy import retry_scheduler, result_by_deadline, remaining_time
 from dotenv import load_dotenv
-import traceback
+from concurrent.futures import wait
 from product_extraction import extract_and_store_products
-from zenrows import ZenRowsClient
+from scrape_engine import iter_qualified_sites, order_by_priority
+from extraction_engine import SITE_SPECS, extract_site, make_extractor
+from ranking import rank_products
+from product import Product
+from query_classifier import classify
+from cache_config import search_cache
+from single_flight import SingleFlight
+from search_refresh import search_refresher
+from product_catalog import product_catalog, CATALOG_MIN_SITES
 
 
 load_dotenv()
 SCRAPER_API_KEY = os.getenv("scraper_api")
-SCRAPINGBEE_API_KEY = os.getenv("scraping_bee_api")
 
-memory_cache = {}
+# Bounded TTL/LRU cache shared with scrap_global
+memory_cache = search_cache
 
-RATING_SITES = {
-    "jumia": "https://www.jumia.com.ng/catalog/?q=",
-    "amazon": "https://www.amazon.com/s?k="
-}
+# 🛫 Identical searches in flight share one scrape (category and single-site searches)
+search_flights = SingleFlight("search")
 
-NON_RATING_SITES = {
-    "konga": "https://www.konga.com/search?search=",
-    "slot": "https://slot.ng/?s=",
-    "kara": "https://www.kara.com.ng/catalogsearch/result/?q=",
-    "ajebomarket": "https://ajebomarket.com/?s=",
-    "topsuccess": "https://topsuccess.ng/?s=",
-    "jiji": "https://jiji.ng/search?query="
-}
+# Search URLs come from SITE_SPECS; Amazon isn't parsed from HTML, so it has no spec
+SEARCH_URLS = {site: spec["search_url"] for site, spec in SITE_SPECS.items()}
+SEARCH_URLS["amazon"] = "https://www.amazon.com/s?k="
 
+# Sites whose results carry star ratings: Amazon, and every spec with a rating selector
+RATING_SITES = {site: url for site, url in SEARCH_URLS.items() if site == "amazon" or SITE_SPECS[site].get("rating")}
+NON_RATING_SITES = {site: url for site, url in SEARCH_URLS.items() if site not in RATING_SITES}
 
-PRODUCT_PRIORITY = {
-    "fashion": ["ajebomarket", "konga", "jiji"],
-    "electronics": ["slot", "kara", "topsuccess", "jiji"],
-    "phones & tablets": ["slot", "kara", "jiji"],
-    "appliances": ["kara", "topsuccess", "jiji"],
-    "health & beauty": ["konga", "jiji"],
-    "home & office": ["kara", "konga", "topsuccess", "jiji"],
-    "supermarket": ["konga", "jiji"],
-    "computing": ["slot", "kara", "jiji"],
-    "baby products": ["konga", "jiji"],
-    "gaming": ["kara", "jiji"],
-    "musical instruments": ["kara", "jiji"],
-    "general": ["konga", "slot", "kara", "topsuccess", "ajebomarket", "jiji"]
-}
-
-# Category → keywords to detect
-PRODUCT_KEYWORDS = {
-    "fashion": ["shirt", "jeans", "trouser", "dress", "shoe", "wear", "jacket", "cap", "bag", "t-shirt"],
-    "electronics": ["tv", "laptop", "monitor", "camera", "speaker", "bluetooth", "dvd", "decoder"],
-    "phones & tablets": ["phone", "iphone", "android", "tablet", "ipad", "smartphone"],
-    "appliances": ["fridge", "refrigerator", "microwave", "freezer", "ac", "air conditioner", "fan", "cooker", "blender", "washing machine"],
-    "health & beauty": ["cream", "lotion", "soap", "shampoo", "toothpaste", "perfume", "skincare"],
-    "home & office": ["sofa", "desk", "chair", "bed", "lamp", "cabinet", "table", "mattress"],
-    "supermarket": ["milk", "rice", "noodles", "biscuit", "sugar", "beverage", "tea", "juice"],
-    "computing": ["keyboard", "mouse", "cpu", "ram", "ssd", "hard disk", "computer", "pc", "macbook"],
-    "baby products": ["diaper", "baby", "stroller", "wipes", "milk", "feeder"],
-    "gaming": ["console", "ps5", "xbox", "gamepad", "controller", "joystick"],
-    "musical instruments": ["guitar", "keyboard", "drum", "piano", "microphone", "violin"]
-}
+# Category → site priority and keyword tables live in query_classifier.py
 
 def generate_cache_key(query):
     return hashlib.md5(query.encode()).hexdigest()
 
-def fetch_with_retry(payload, use_scrapingbee=False, retries=3, delay=5):
-    base_url = "https://app.scrapingbee.com/api/v1" if use_scrapingbee else "https://api.scraperapi.com/"
-
-    for attempt in range(retries):
-        try:
-            response = requests.get(base_url, params=payload, headers={"User-Agent": "Mozilla/5.0"})
-            print(f"[DEBUG] Attempt {attempt + 1} → Status: {response.status_code}")
-            print(f"[DEBUG] Final URL: {response.url}")
-
-            if response.status_code == 200:
-                return response
-            else:
-                print(f"[ERROR] Non-200 status. Content:\n{response.text[:500]}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Request exception: {e}")
-
-        time.sleep(random.randint(1, delay))
-
-    return None
-#AJEBO
-def fuzzy_partial_match(query, name):
-    query = query.lower().replace("'", "").replace("’", "")
-    name = name.lower().replace("'", "").replace("’", "")
-    return query in name or any(word in name for word in query.split())
-
-
-
-def fuzzy_match(query, name):
-    return all(word in name.lower() for word in query.lower().split())
-
-
-#Function to give a definate product return and filter out unecessary product not searched
-UNWANTED_KEYWORDS = {"case", "cover", "protector", "screen", "glass"}
-
-def is_relevant_product(query, name):
-    if not fuzzy_match(query, name):
-        return False
-    name_lower = name.lower()
-    return not any(bad in name_lower for bad in UNWANTED_KEYWORDS)
 
+def search_url(site, product_query):
+    return SEARCH_URLS[site] + product_query.replace(" ", "+")
 
 #---------------------------------------------EXTRACTION----------------------------------------------------------------------------
-#JUMIA EXTRACT
-
-# JUMIA
-def extract_jumia_data(html, product_query):
-    soup = BeautifulSoup(html, "html.parser")
-    product_cards = soup.select("article.prd")[:30]
-    products = []
-
-    # Keywords to exclude accessories, cases, chargers, etc.
-    exclusion_keywords = ["case", "cover", "screen", "protector", "charger", "cable", "adapter", "glass", "earpiece", "battery", "strap"]
-
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("h3.name")
-            price_elem = card.select_one("div.prc")
-            image_elem = card.select_one("img")
-            link_elem = card.select_one("a.core") or card.find("a")
-
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            link = "https://www.jumia.com.ng" + link_elem["href"] if link_elem else None
-            image = image_elem.get("data-src") or image_elem.get("src") if image_elem else None
-
-            stars_container = card.select_one("div.stars")
-            in_div = stars_container.select_one("div.in") if stars_container else None
-            style = in_div.get("style") if in_div else ""
-            star_value = None
-            if style and "width" in style:
-                width_percent = float(style.split("width:")[1].replace("%", "").strip())
-                star_value = round((width_percent / 100) * 5, 1)
-
-            # Filter: skip accessories or unrelated items
-            if name and any(ex_kw.lower() in name.lower() for ex_kw in exclusion_keywords):
-                continue
+# HTML sites are parsed by the spec-driven engine in extraction_engine.py (selectors live in SITE_SPECS)
 
-            if name and price and link and image and fuzzy_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "rating": star_value if star_value else 0.0,
-                    "url": link,
-                    "image": image
-                })
-
-        except Exception:
-            continue
-
-    # Sort best rated first
-    five_star = [p for p in products if p["rating"] == 5.0]
-    four_star = [p for p in products if 4.0 <= p["rating"] < 5.0]
-    sorted_results = five_star + sorted(four_star, key=lambda x: x["rating"], reverse=True)
-
-    return sorted_results[:4] if sorted_results else []
-
-
-# KONGA
-def extract_konga_data(html, product_query):
-    soup = BeautifulSoup(html, "html.parser")
-    # print(f"\n\nThe soup object returned here is:\n{soup.prettify()}")  # ← This shows the full HTML in your terminal
-    product_cards = soup.select("article.a2cf5_2S5q5")[:30]
-    products = []
-
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("h3.af885_1iPzH")
-            price_elem = card.select_one("span.d7c0f_sJAqi")
-            image_elem = card.select_one("img")
-            link_elem = card.select_one("a[href*='/product/']")
-
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            link = "https://www.konga.com" + link_elem["href"] if link_elem else None
-            image = image_elem.get("src") if image_elem else None
-
-            if name and price and link and image and fuzzy_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": link,
-                    "image": image
-                })
-        except Exception:
-            continue
-
-    return products[:4] if products else []
-
-# SLOT
 # SLOT (ZenRows)
 def extract_slot_data(_, product_query):
 
-    ZENROW_API_KEY = os.getenv("zenrow_scraper_api")
-    client = ZenRowsClient(ZENROW_API_KEY)
-
-    search_url = f"https://slot.ng/?s={product_query.replace(' ', '+')}"
-    print(f"[ZENROWS] 🌐 Slot Search URL: {search_url}")
+    url = search_url("slot", product_query)
+    print(f"[ZENROWS] 🌐 Slot Search URL: {url}")
 
     try:
-        response = client.get(search_url, params={"js_render": "true", "wait_for": ".products"})
-        html = response.text
-
-        soup = BeautifulSoup(html, "html.parser")
-        product_cards = soup.select("ul.products li")[:30]
-        products = []
-
-        for card in product_cards:
-            try:
-                name_elem = card.select_one("h2.woocommerce-loop-product__title")
-                price_elem = card.select_one("span.woocommerce-Price-amount")
-                image_elem = card.select_one("img")
-                link_elem = card.select_one("a.woocommerce-LoopProduct-link")
-
-                name = name_elem.text.strip() if name_elem else None
-                price = price_elem.text.strip() if price_elem else None
-                link = link_elem["href"] if link_elem else None
-                image = image_elem.get("src") if image_elem else None
-
-                if name and price and link and image and fuzzy_match(product_query, name):
-                    products.append({
-                        "name": name,
-                        "price": price,
-                        "url": link,
-                        "image": image
-                    })
-            except Exception:
-                continue
+        # ZenRows (JS rendering, waits for .products) first; other providers on failure
+        _, response = provider_router.fetch_page("slot", url)
+        if response is None:
+            return []
+        return extract_site("slot", response.text, product_query)
 
-        return products[:4] if products else []
-    
     except Exception as e:
         print(f"[ERROR] ZenRows scraping failed for Slot: {e}")
         return []
 
 
+# Amazon detail fetching: "full" fetches every ASIN's product page,
+# "lazy" builds products from the search payload and fetches only what is missing
+AMAZON_DETAIL_MODE = os.getenv("AMAZON_DETAIL_MODE", "full")
+AMAZON_PRODUCT_ENDPOINT = "https://api.scraperapi.com/structured/amazon/product"
 
-#KARA EXTRACT
-
-def extract_kara_data(html, product_query):
-    soup = BeautifulSoup(html, "html.parser")
-    # print(f"\n\nThe soup object returned here is:\n{soup.prettify()}") 
-    product_cards = soup.select("li.item")[:30]
-    products = []
-
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("h2.product-name a")
-            price_elem = card.select_one("span.price")
-            image_elem = card.select_one("img")
-            link_elem = name_elem
-
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            link = link_elem["href"] if link_elem else None
-            image = image_elem.get("src") if image_elem else None
-
-            if name and price and link and image and fuzzy_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": link,
-                    "image": image
-                })
-        except Exception:
-            continue
-
-    return products[:4] if products else []
 
+def fetch_amazon_product(asin):
+    """Start fetching one ASIN from the structured product endpoint; a Future with the response."""
+    return retry_scheduler.submit(
+        lambda: http_client.get("scraperapi", AMAZON_PRODUCT_ENDPOINT, params={"api_key": SCRAPER_API_KEY, "asin": asin}),
+        label=f"amazon/{asin}"
+    )
 
-def extract_ajebomarket_data(html, product_query):
-    from bs4 import BeautifulSoup
-
-    soup = BeautifulSoup(html, "html.parser")
-    product_cards = soup.select("div.card-wrapper")[:30]
-    print(f"[DEBUG] Ajebomarket: Found {len(product_cards)} product cards.")
-
-    products = []
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("h3.product__title a")  # ✅ updated selector
-            price_elem = card.select_one("span.price")
-            image_elem = card.select_one("img")
-            link_elem = name_elem
-
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            image = image_elem.get("src") if image_elem else None
-            if image and image.startswith("//"):
-                image = "https:" + image
-            link = link_elem.get("href") if link_elem else None
-            if link and link.startswith("/"):
-                link = "https://ajebomarket.com" + link
-
-            if not name:
-                continue  # ⛔ skip before matching if name is None
-
-            print(f"[CHECK] {name} → Match: {fuzzy_partial_match(product_query, name)}")
-
-            if price and image and link and fuzzy_partial_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": link,
-                    "image": image
-                })
-        except Exception as e:
-            print(f"[ERROR] Ajebomarket parsing error: {e}")
-            continue
-
-    print(f"[INFO] Ajebomarket: Returning {len(products[:4])} products.")
-    return products[:4] if products else []
-
-
-
-
-#TOP SUCCES EXTRACT 
-
-def extract_topsuccess_data(html, product_query):
-    soup = BeautifulSoup(html, "html.parser")
-    # print(f"\n\nThe soup object returned here is:\n{soup.prettify()}") 
-    product_cards = soup.select("div.product-small")[:30]
-    products = []
-
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("p.name.product-title")
-            price_elem = card.select_one("span.woocommerce-Price-amount")
-            image_elem = card.select_one("img")
-            link_elem = card.select_one("a.woocommerce-LoopProduct-link")
 
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            link = link_elem["href"] if link_elem else None
-            image = image_elem.get("src") if image_elem else None
+def amazon_detail_json(future, asin):
+    """JSON of a finished detail fetch, or None if it failed or is still running."""
+    if not future.done():
+        future.cancel()
+        print(f"[⏱️ AMAZON] Deadline reached before ASIN {asin} was fetched")
+        return None
+    try:
+        res = future.result()
+        if res.status_code != 200:
+            return None
+        return res.json()
+    except Exception as e:
+        print(f"[⚠️ AMAZON] Failed to fetch ASIN {asin}: {e}")
+        return None
 
-            if name and price and link and image and fuzzy_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": link,
-                    "image": image
-                })
-        except Exception:
-            continue
 
-    return products[:4] if products else []
+def amazon_fields_from_detail(data):
+    return {
+        "name": data.get("name"),
+        "price": data.get("pricing") or data.get("list_price", "Not listed"),
+        "rating": float(data.get("average_rating", 0.0)),
+        "image": data.get("images", [None])[0]
+    }
 
 
-#JIJI EXTRACTOR 
+def amazon_fields_from_search(item):
+    rating = item.get("stars")
+    return {
+        "name": item.get("name"),
+        "price": item.get("price_string"),
+        "rating": float(rating) if rating is not None else None,
+        "image": item.get("image")
+    }
 
-def extract_jiji_data(html, product_query):
-    soup = BeautifulSoup(html, "html.parser")
 
-    # print(f"\n\nThe soup object returned here is:\n{soup.prettify()}") 
-    product_cards = soup.select("div.b-list-advert__item")[:30]
-    products = []
+def needs_amazon_detail(fields):
+    return not fields or any(value is None for value in fields.values())
 
-    for card in product_cards:
-        try:
-            name_elem = card.select_one("div.b-list-advert__title a")
-            price_elem = card.select_one("div.b-list-advert__price")
-            image_elem = card.select_one("img")
-            link_elem = name_elem
 
-            name = name_elem.text.strip() if name_elem else None
-            price = price_elem.text.strip() if price_elem else None
-            link = "https://jiji.ng" + link_elem["href"] if link_elem else None
-            image = image_elem.get("src") if image_elem else None
+def build_amazon_product(asin, fields, detail=None):
+    """One Amazon product from its search fields, with missing ones filled in from the detail JSON."""
+    try:
+        if detail is not None:
+            from_detail = amazon_fields_from_detail(detail)
+            fields = {key: fields.get(key) if fields.get(key) is not None else value for key, value in from_detail.items()}
 
-            if name and price and link and image and fuzzy_match(product_query, name):
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": link,
-                    "image": image
-                })
-        except Exception:
-            continue
+        if not (fields["name"] and fields["image"]):
+            return None
 
-    return products[:4] if products else []
+        return Product(
+            "amazon", fields["name"], fields["price"], rating=fields["rating"],
+            url=f"https://www.amazon.com/dp/{asin}", image=fields["image"]
+        )
 
+    except Exception as e:
+        print(f"[⚠️ AMAZON] Failed to process ASIN {asin}: {e}")
+        return None
 
 
-def extract_amazon_data(html, product_query):
+def extract_amazon_data(html, product_query, detail_mode=None):
+    detail_mode = detail_mode or AMAZON_DETAIL_MODE
     print(f"[🔍 AMAZON] Structured search for: {product_query}")
 
     # Step 1: Keyword Search to get ASINs
@@ -399,166 +150,179 @@ def extract_amazon_data(html, product_query):
         "query": product_query
     }
 
-    search_res = requests.get(search_endpoint, params=search_params)
+    try:
+        search_res = result_by_deadline(retry_scheduler.submit(
+            lambda: http_client.get("scraperapi", search_endpoint, params=search_params), label="amazon/search"
+        ))
+    except requests.exceptions.RequestException as e:
+        print(f"[❌ AMAZON] Search failed: {e}")
+        return []
     if search_res.status_code != 200:
         print("[❌ AMAZON] Search failed")
         return []
 
     search_data = search_res.json()
-    asins = [item["asin"] for item in search_data.get("results", []) if "asin" in item][:4]
+    search_items = [item for item in search_data.get("results", []) if "asin" in item][:4]
+    asins = [item["asin"] for item in search_items]
     print(f"[✅ AMAZON] Found ASINs: {asins}")
 
-    # Step 2: Fetch product data for each ASIN
-    product_endpoint = "https://api.scraperapi.com/structured/amazon/product"
-    products = []
+    if not search_items:
+        return []
+
+    # Step 2: Start every needed detail fetch at once and wait for them together, within the deadline
+    fields = [
+        (item["asin"], amazon_fields_from_search(item) if detail_mode == "lazy" else {})
+        for item in search_items
+    ]
+    details = {asin: fetch_amazon_product(asin) for asin, item_fields in fields if needs_amazon_detail(item_fields)}
+    if details:
+        left = remaining_time()
+        wait(details.values(), timeout=None if left is None else max(0.0, left))
 
-    for asin in asins:
-        try:
-            res = requests.get(product_endpoint, params={"api_key": SCRAPER_API_KEY, "asin": asin})
-            if res.status_code != 200:
+    products = []
+    for asin, item_fields in fields:
+        detail = None
+        if asin in details:
+            detail = amazon_detail_json(details[asin], asin)
+            if detail is None:
                 continue
+        product = build_amazon_product(asin, item_fields, detail)
+        if product:
+            products.append(product)
+
+    # Same scoring as every other site (relevance, rating, price, trust)
+    return rank_products(product_query, products)
+
 
-            data = res.json()
 
-            name = data.get("name")
-            price = data.get("pricing") or data.get("list_price", "Not listed")
-            rating = float(data.get("average_rating", 0.0))
-            url = f"https://www.amazon.com/dp/{asin}"
-            image = data.get("images", [None])[0]
 
-            if name and image:
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "rating": rating,
-                    "url": url,
-                    "image": image
-                })
 
-        except Exception as e:
-            print(f"[⚠️ AMAZON] Failed to process ASIN {asin}: {e}")
-            continue
+def determine_product_type(query):
+    return classify(query).category
 
-    # Sort like Jumia
-    five_star = [p for p in products if p["rating"] == 5.0]
-    four_star = [p for p in products if 4.0 <= p["rating"] < 5.0]
-    sorted_results = five_star + sorted(four_star, key=lambda x: x["rating"], reverse=True)
+# Extractors that call their own endpoint (structured API / ZenRows) and ignore proxied HTML
+SELF_FETCHING_EXTRACTORS = {
+    "amazon": extract_amazon_data,
+    "slot": extract_slot_data
+}
+SELF_FETCHING_SITES = set(SELF_FETCHING_EXTRACTORS)
 
-    return sorted_results[:4]
+# site → extractor(html, product_query): the spec-driven engine for every SITE_SPECS site
+EXTRACTOR_MAP = {site: make_extractor(site) for site in SITE_SPECS}
+EXTRACTOR_MAP.update(SELF_FETCHING_EXTRACTORS)
 
 
+def scrape_site(site, sites_dict, product_query):
+    """
+    Fetch one site's search page through the proxy and run its extractor.
+    Returns the extracted products, or None if the site could not be scraped.
+    """
+    if site not in sites_dict:
+        print(f"[WARN] Site key '{site}' not found in dictionary.")
+        return None
 
+    extractor = EXTRACTOR_MAP.get(site)
+    if not extractor:
+        print(f"[ERROR] No extractor defined for site: {site}")
+        return None
 
+    print(f"[INFO] Scraping from: {site}")
 
-def determine_product_type(query):
-    q = query.lower()
-    for category, keywords in PRODUCT_KEYWORDS.items():
-        if any(keyword in q for keyword in keywords):
-            return category
-    return "general"
+    if site in SELF_FETCHING_SITES:
+        print(f"[DEBUG] Running self-fetching extractor for {site}")
+        return extractor(None, product_query)
 
-def scrape_products_by_category(product_query, category="ratings"):
+    url = search_url(site, product_query)
+    print(f"[DEBUG] Search URL: {url}")
+
+    # 🔀 Usual provider for the site first (ScrapingBee for Jumia, ScraperAPI otherwise), with failover/hedging
+    provider, response = provider_router.fetch_page(site, url)
+    if response is None:
+        print(f"[ERROR] No provider could fetch {site}")
+        return None
+    print(f"[DEBUG] {provider} → Status: {response.status_code}")
+    print(f"[DEBUG] Final URL: {response.url}")
+
+    print(f"[DEBUG] Running extractor for {site}")
+    return extractor(response.text, product_query)
+
+
+def sites_for_category(product_query, category="ratings"):
+    """Return (sites_dict, site_keys) to scrape for a search category."""
+    if category == "non-ratings":
+        return NON_RATING_SITES, list(classify(product_query).priority)
+
+    # "ratings", and default fallback to ratings
+    return RATING_SITES, list(RATING_SITES.keys())  # e.g., ["jumia", "amazon"]
+
+
+def flight_key(*parts):
+    """Coalescing key: the query is case- and whitespace-normalized."""
+    query, *rest = parts
+    return (" ".join(query.lower().split()), *rest)
+
+
+def iter_products_by_category(product_query, category="ratings", max_sites=3, min_products_per_site=2):
+    """
+    Iterate each qualifying site's {"site", "data"} block as soon as its extractor
+    finishes. Once the search completes, results are cached and stored in
+    priority order; cache hits yield every block at once, and stale hits are
+    re-scraped in the background after being served. On a cache miss, fresh
+    products in the local catalog answer without scraping. Identical searches
+    already in flight share that scrape instead of starting their own.
+    """
     cache_key = generate_cache_key(f"{category}:{product_query}")
-    if cache_key in memory_cache:
-        return memory_cache[cache_key]
+    key = flight_key(product_query, category, max_sites, min_products_per_site)
 
-    product_type = determine_product_type(product_query)
-    results = []
+    def scrape():
+        return search_flights.stream(
+            key, lambda: _scrape_products_by_category(product_query, category, max_sites, min_products_per_site)
+        )
 
-    EXTRACTOR_MAP = {
-        "jumia": extract_jumia_data,
-        "amazon": extract_amazon_data,
-        "konga": extract_konga_data,
-        "slot": extract_slot_data,
-        "kara": extract_kara_data,
-        "ajebomarket": extract_ajebomarket_data,
-        "topsuccess": extract_topsuccess_data,
-        "jiji": extract_jiji_data
-    }
+    def refresh():
+        list(scrape())
 
-    def try_scraping_sites(sites_dict, site_keys, max_sites=3, min_products_per_site=2):
-        site_results = []
-        for site in site_keys:
-            try:
-                if site not in sites_dict:
-                    print(f"[WARN] Site key '{site}' not found in dictionary.")
-                    continue
-
-                base_url = sites_dict[site]
-                search_url = base_url + product_query.replace(" ", "+")
-                print(f"[INFO] Scraping from: {site}")
-                print(f"[DEBUG] Search URL: {search_url}")
-
-                # 🔁 Choose ScrapingBee for Jumia, ScraperAPI otherwise
-                if site == "jumia":
-                    payload = {
-                        'api_key': os.getenv("scraping_bee_api"),
-                        'url': search_url,
-                        'render_js': "true"
-                    }
-                    proxy_url = "https://app.scrapingbee.com/api/v1"
-                else:
-                    payload = {
-                        'api_key': SCRAPER_API_KEY,
-                        'url': search_url,
-                        'render': 'true',
-                        'autoparse': 'false',
-                        'country_code': 'ng',
-                        'device_type': 'desktop'
-                    }
-                    proxy_url = "https://api.scraperapi.com/"
-
-                response = requests.get(proxy_url, params=payload, headers={"User-Agent": "Mozilla/5.0"})
-                print(f"[DEBUG] Attempt → Status: {response.status_code}")
-                print(f"[DEBUG] Final URL: {response.url}")
-
-                if response.status_code != 200:
-                    print(f"[ERROR] Non-200 response from {site}. Content:\n{response.text[:400]}")
-                    continue
-
-                html = response.text
-                extractor = EXTRACTOR_MAP.get(site)
-                if not extractor:
-                    print(f"[ERROR] No extractor defined for site: {site}")
-                    continue
-
-                print(f"[DEBUG] Running extractor for {site}")
-                products = extractor(html, product_query)
-
-                if not products:
-                    print(f"[WARN] No products found on {site}")
-                elif len(products) < min_products_per_site:
-                    print(f"[WARN] Only {len(products)} products found on {site}, below threshold of {min_products_per_site}")
-                else:
-                    print(f"[INFO] {len(products)} products found on {site}")
-                    site_results.append({
-                        "site": site,
-                        "data": products[:min_products_per_site]
-                    })
-
-                if len(site_results) >= max_sites:
-                    break
-
-            except Exception as e:
-                print(f"[EXCEPTION] Failed scraping {site}: {e}")
-                traceback.print_exc()
-
-        return site_results
-
-    # Site groups
-    rating_sites = list(RATING_SITES.keys())  # e.g., ["jumia", "amazon"]
-    non_rating_sites = PRODUCT_PRIORITY.get(product_type, PRODUCT_PRIORITY["general"])
-
-    if category == "ratings":
-        results = try_scraping_sites(RATING_SITES, rating_sites)
-
-    elif category == "non-ratings":
-        results = try_scraping_sites(NON_RATING_SITES, non_rating_sites)
-
-    else:
-        # Default fallback to ratings
-        results = try_scraping_sites(RATING_SITES, rating_sites)
-
-    memory_cache[cache_key] = (results, False)
+    search_refresher.touch(cache_key, product_query, refresh)
+    cached, stale = memory_cache.get_with_state(cache_key)
+    if cached is not None:
+        if stale:
+            search_refresher.revalidate(cache_key, product_query, refresh)
+        return iter(cached[0])
+
+    _, site_keys = sites_for_category(product_query, category)
+    catalog = product_catalog.search_blocks(
+        product_query, site_keys, min_products_per_site,
+        min_sites=min(CATALOG_MIN_SITES, max_sites, len(site_keys))
+    )
+    if catalog:
+        return iter(catalog[:max_sites])
+
+    return scrape()
+
+
+def _scrape_products_by_category(product_query, category, max_sites, min_products_per_site):
+    cache_key = generate_cache_key(f"{category}:{product_query}")
+    sites_dict, site_keys = sites_for_category(product_query, category)
+    results = []
+
+    # 🚀 All candidate sites start at once under one deadline
+    for block in iter_qualified_sites(
+        site_keys,
+        lambda site: scrape_site(site, sites_dict, product_query),
+        max_sites=max_sites,
+        min_products_per_site=min_products_per_site
+    ):
+        results.append(block)
+        yield block
+
+    results = order_by_priority(results, site_keys)
+    # A failed refresh must not replace the stale result still being served
+    if results or memory_cache.peek(cache_key)[0] is None:
+        memory_cache.set(cache_key, (results, False))
     extract_and_store_products(results)
+
+
+def scrape_products_by_category(product_query, category="ratings"):
+    _, site_keys = sites_for_category(product_query, category)
+    results = order_by_priority(list(iter_products_by_category(product_query, category)), site_keys)
     return results, False
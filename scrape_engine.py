@@ -0,0 +1,87 @@
+# scrape_engine.py
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from retry_policy import RequestScope
+
+# ⏱️ Whole-request budget (seconds) shared by every site in one search
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", 45))
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", 6))
+
+
+def iter_site_results(site_keys, scrape_fn, deadline=None):
+    """
+    Start scrape_fn(site) for every site at once and yield (site, products)
+    in completion order until all sites finish or the deadline runs out.
+    Sites still running when the caller stops iterating are ignored. Every
+    site fetches inside one RequestScope, so retries never outlive the
+    deadline and this search's attempts never queue behind another's.
+    """
+    site_keys = list(site_keys)
+    if not site_keys:
+        return
+
+    deadline = SCRAPE_DEADLINE if deadline is None else deadline
+    scope = RequestScope(deadline)
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(SCRAPE_MAX_WORKERS, len(site_keys)),
+        thread_name_prefix="scrape"
+    )
+    futures = {executor.submit(scope.run, scrape_fn, site): site for site in site_keys}
+    pending = set(futures)
+
+    try:
+        while pending:
+            remaining = scope.deadline_at - time.monotonic()
+            if remaining <= 0:
+                skipped = ", ".join(futures[f] for f in pending)
+                print(f"[TIMEOUT] ⏱️ Deadline of {deadline}s reached, ignoring: {skipped}")
+                break
+
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                site = futures[future]
+                try:
+                    products = future.result()
+                except Exception as e:
+                    print(f"[EXCEPTION] Failed scraping {site}: {e}")
+                    traceback.print_exception(e)
+                    products = None
+                yield site, products
+    finally:
+        # Drop queued sites and their pending fetches; running ones finish in the background and are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+        scope.close()
+
+
+def iter_qualified_sites(site_keys, scrape_fn, max_sites=3, min_products_per_site=2, deadline=None):
+    """
+    Yield {"site", "data", "candidates"} blocks in completion order, as soon as
+    each site reaches min_products_per_site, stopping after max_sites blocks.
+    data is the site's top products; candidates keeps every ranked match for
+    the cross-site ranking.
+    """
+    found = 0
+    for site, products in iter_site_results(site_keys, scrape_fn, deadline=deadline):
+        if not products:
+            print(f"[WARN] No products found on {site}")
+        elif len(products) < min_products_per_site:
+            print(f"[WARN] Only {len(products)} products found on {site}, below threshold of {min_products_per_site}")
+        else:
+            print(f"[INFO] {len(products)} products found on {site}")
+            found += 1
+            yield {
+                "site": site,
+                "data": products[:min_products_per_site],
+                "candidates": products
+            }
+
+        if found >= max_sites:
+            break
+
+
+def order_by_priority(site_results, site_keys):
+    priority = {site: i for i, site in enumerate(site_keys)}
+    return sorted(site_results, key=lambda r: priority.get(r["site"], len(priority)))
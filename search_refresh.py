@@ -0,0 +1,191 @@
+# search_refresh.py
+# ♻️ Background re-scraping for the search cache: stale hits are refreshed after being
+# served, and the hottest queries are re-scraped before they expire, within a refresh budget.
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cache_config import search_cache
+
+# SEARCH_REFRESH=0 turns off every background re-scrape: stale hits are still served, just not refreshed
+SEARCH_REFRESH_ENABLED = os.getenv("SEARCH_REFRESH", "1") != "0"
+# Background re-scrapes allowed per hour in this worker (each one costs proxy credits)
+SEARCH_REFRESH_BUDGET = int(os.getenv("SEARCH_REFRESH_BUDGET", 60))
+# Hot queries considered for proactive refresh, and how early before expiry they are refreshed
+SEARCH_REFRESH_TOP_N = int(os.getenv("SEARCH_REFRESH_TOP_N", 20))
+SEARCH_REFRESH_AHEAD = float(os.getenv("SEARCH_REFRESH_AHEAD", 300))
+SEARCH_REFRESH_INTERVAL = float(os.getenv("SEARCH_REFRESH_INTERVAL", 60))
+SEARCH_REFRESH_WORKERS = int(os.getenv("SEARCH_REFRESH_WORKERS", 2))
+# Query popularity halves after this many seconds without hits
+HOT_QUERY_HALF_LIFE = float(os.getenv("HOT_QUERY_HALF_LIFE", 3600))
+HOT_QUERY_MAX_KEYS = 1000
+
+
+class RefreshBudget:
+    """Sliding one-hour window of background refreshes."""
+
+    def __init__(self, per_hour=SEARCH_REFRESH_BUDGET):
+        self.per_hour = per_hour
+        self._spent = deque()
+        self._lock = threading.Lock()
+        self.denied = 0
+
+    def try_spend(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0] >= 3600:
+                self._spent.popleft()
+            if len(self._spent) >= self.per_hour:
+                self.denied += 1
+                return False
+            self._spent.append(now)
+            return True
+
+    def exhausted(self):
+        with self._lock:
+            return len(self._spent) >= self.per_hour and time.monotonic() - self._spent[0] < 3600
+
+    def used(self):
+        with self._lock:
+            return len(self._spent)
+
+
+class HotQueryTracker:
+    """Exponentially decayed hit counts per cache key, with the callable that re-scrapes it."""
+
+    def __init__(self, half_life=HOT_QUERY_HALF_LIFE, max_keys=HOT_QUERY_MAX_KEYS):
+        self.decay = math.log(2) / half_life
+        self.max_keys = max_keys
+        self._entries = {}  # key → [score, last_hit, label, refresh_fn]
+        self._lock = threading.Lock()
+
+    def record(self, key, label, refresh_fn):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_keys:
+                    coldest = min(self._entries, key=lambda k: self._score(self._entries[k], now))
+                    del self._entries[coldest]
+                self._entries[key] = [1.0, now, label, refresh_fn]
+                return
+            entry[0] = self._score(entry, now) + 1
+            entry[1] = now
+            entry[3] = refresh_fn
+
+    def top(self, n):
+        """[(key, label, refresh_fn, score)] for the n hottest keys."""
+        now = time.monotonic()
+        with self._lock:
+            scored = [(key, e[2], e[3], self._score(e, now)) for key, e in self._entries.items()]
+        scored.sort(key=lambda item: item[3], reverse=True)
+        return scored[:n]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _score(self, entry, now):
+        return entry[0] * math.exp(-self.decay * (now - entry[1]))
+
+
+class SearchRefresher:
+    """
+    Refreshes search-cache entries off the request path. revalidate() is called
+    after a stale entry has been served; the background loop re-scrapes hot
+    queries close to expiry. Every refresh draws from the RefreshBudget, and a
+    key is never refreshed twice at once.
+    """
+
+    def __init__(self, cache, budget=None, tracker=None):
+        self.cache = cache
+        self.budget = budget or RefreshBudget()
+        self.tracker = tracker or HotQueryTracker()
+        self._executor = ThreadPoolExecutor(max_workers=SEARCH_REFRESH_WORKERS, thread_name_prefix="refresh")
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refreshed = 0
+        self.failed = 0
+
+    def touch(self, key, label, refresh_fn):
+        """Count a lookup of key towards its popularity."""
+        self.tracker.record(key, label, refresh_fn)
+
+    def revalidate(self, key, label, refresh_fn, reason="stale"):
+        """Queue a background refresh of key. Returns False if refresh is off, already running or over budget."""
+        if not SEARCH_REFRESH_ENABLED:
+            return False
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            if not self.budget.try_spend():
+                print(f"[REFRESH] 🚦 Refresh budget spent, leaving '{label}' {reason}")
+                return False
+            self._refreshing.add(key)
+
+        print(f"[REFRESH] ♻️ Re-scraping '{label}' in the background ({reason})")
+        self._executor.submit(self._run, key, label, refresh_fn)
+        return True
+
+    def refresh_hot(self):
+        """Refresh the hottest cached queries that expire within SEARCH_REFRESH_AHEAD seconds."""
+        queued = 0
+        for key, label, refresh_fn, _ in self.tracker.top(SEARCH_REFRESH_TOP_N):
+            if self.budget.exhausted():
+                break
+            value, left = self.cache.peek(key)
+            if value is None or left > SEARCH_REFRESH_AHEAD:
+                continue
+            if self.revalidate(key, label, refresh_fn, reason="hot"):
+                queued += 1
+        return queued
+
+    def start(self):
+        """Start the proactive refresh loop (once per process)."""
+        if not SEARCH_REFRESH_ENABLED or self._thread is not None:
+            return None
+        self._thread = threading.Thread(target=self._loop, name="search-refresh", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stats(self):
+        with self._lock:
+            running = len(self._refreshing)
+        return {
+            "enabled": SEARCH_REFRESH_ENABLED,
+            "running": running,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "budget_per_hour": self.budget.per_hour,
+            "budget_used": self.budget.used(),
+            "budget_denied": self.budget.denied,
+            "tracked_queries": len(self.tracker)
+        }
+
+    def _run(self, key, label, refresh_fn):
+        ok = False
+        try:
+            refresh_fn()
+            ok = True
+        except Exception as e:
+            print(f"[REFRESH] ⚠️ Refresh of '{label}' failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+                if ok:
+                    self.refreshed += 1
+                else:
+                    self.failed += 1
+
+    def _loop(self):
+        while True:
+            time.sleep(SEARCH_REFRESH_INTERVAL)
+            try:
+                self.refresh_hot()
+            except Exception as e:
+                print(f"[REFRESH] ⚠️ Hot-query pass failed: {e}")
+
+
+search_refresher = SearchRefresher(search_cache)
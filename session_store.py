@@ -0,0 +1,97 @@
+# session_store.py
+import threading
+import time
+from collections import OrderedDict, deque
+
+_UNSET = object()
+
+
+class Turn:
+    """One user message, with its extracted product memoized on first use."""
+
+    __slots__ = ("text", "_product")
+
+    def __init__(self, text):
+        self.text = text
+        self._product = _UNSET
+
+    def product(self, extract):
+        if self._product is _UNSET:
+            self._product = extract(self.text)
+        return self._product
+
+
+class ConversationState:
+    """Per-session chat state: a fixed-size ring buffer of turns plus the product/brand context."""
+
+    __slots__ = ("history", "context", "first_response", "last_seen", "lock")
+
+    def __init__(self, max_turns):
+        self.history = deque(maxlen=max_turns)
+        self.context = {"product": None, "brand": None}
+        self.first_response = True
+        self.last_seen = time.monotonic()
+        self.lock = threading.RLock()
+
+    def add_turn(self, text):
+        turn = Turn(text)
+        self.history.append(turn)
+        return turn
+
+    def previous_turns(self):
+        """Earlier turns, newest first (excludes the current one)."""
+        turns = list(self.history)[:-1]
+        turns.reverse()
+        return turns
+
+
+class SessionStore:
+    """
+    Bounded map of session id → ConversationState. Sessions idle longer than
+    idle_ttl are dropped, and the least recently used go first once
+    max_sessions is reached.
+    """
+
+    SWEEP_SECONDS = 60
+
+    def __init__(self, max_turns=20, idle_ttl=1800, max_sessions=5000):
+        self.max_turns = max_turns
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, session_id):
+        """State for a session, created on first use."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.SWEEP_SECONDS:
+                self._sweep(now)
+
+            state = self._sessions.get(session_id)
+            if state is None or now - state.last_seen > self.idle_ttl:
+                state = ConversationState(self.max_turns)
+                self._sessions[session_id] = state
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_seen = now
+            return state
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        # Oldest first: stop at the first session that is still active
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_seen <= self.idle_ttl:
+                break
+            del self._sessions[session_id]
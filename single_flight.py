@@ -0,0 +1,105 @@
+# single_flight.py
+import threading
+
+
+class Flight:
+    """One in-flight computation: the items produced so far and how it ended."""
+
+    __slots__ = ("items", "done", "error", "cond")
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def append(self, item):
+        with self.cond:
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.error = error
+            self.done = True
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent work. The first caller for a key starts the
+    producer in a background thread; every caller (first included) reads the
+    same items as they are produced. The producer always runs to completion,
+    so a caller that stops early (client disconnect) doesn't cut the others off
+    and the result still reaches the caches. Keys are forgotten once the
+    producer finishes; later callers are expected to hit a cache instead.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+
+    def stream(self, key, producer):
+        """Iterate producer()'s items, sharing one run among concurrent callers with the same key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+                self.started += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            threading.Thread(
+                target=self._run, args=(key, flight, producer), name=f"flight-{self.name}", daemon=True
+            ).start()
+        else:
+            print(f"[FLIGHT] ⏳ Joining in-flight {self.name} for {str(key)[:80]}")
+        return self._follow(flight)
+
+    def do(self, key, fn):
+        """Call fn() once for concurrent callers with the same key and return its result to all of them."""
+        def producer():
+            yield fn()
+        for value in self.stream(key, producer):
+            return value
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self):
+        return {"in_flight": self.in_flight(), "started": self.started, "coalesced": self.coalesced}
+
+    def _run(self, key, flight, producer):
+        error = None
+        try:
+            for item in producer():
+                flight.append(item)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.finish(error)
+
+    @staticmethod
+    def _follow(flight):
+        index = 0
+        while True:
+            with flight.cond:
+                while index >= len(flight.items) and not flight.done:
+                    flight.cond.wait()
+                if index < len(flight.items):
+                    item = flight.items[index]
+                    index += 1
+                elif flight.error is not None:
+                    raise flight.error
+                else:
+                    return
+            yield item
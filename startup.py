@@ -0,0 +1,43 @@
+# startup.py
+# ⏱️ Boot-stage timings and the background warm-up for heavy subsystems.
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Stage name → seconds, in the order the stages ran (read by benchmarks/bench_startup.py)
+STARTUP_TIMINGS = {}
+
+# Load heavy subsystems in a background thread after boot ("0" leaves them to first use)
+WARMUP_ENABLED = os.getenv("WARMUP", "1") != "0"
+
+
+@contextmanager
+def boot_stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = time.perf_counter() - start
+
+
+def start_warmup(tasks):
+    """Run (name, fn) tasks in a daemon thread; a failing task is logged and skipped."""
+    if not WARMUP_ENABLED or not tasks:
+        return None
+
+    def run():
+        for name, fn in tasks:
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                print(f"[WARMUP] ⚠️ {name} failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            STARTUP_TIMINGS[f"warmup:{name}"] = elapsed
+            print(f"[WARMUP] {name} ready in {elapsed * 1000:.0f} ms")
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,6 +1,8 @@
-let categorySuggestions = {};
+let categorySuggestions = [];
 let currentFocus = -1;
 let selectedSpecificSite = null;
+let suggestTimer = null;
+let suggestController = null;
 
 const searchInput = document.getElementById("search-bar");
 const suggestionBox = document.getElementById("suggestions");
@@ -8,26 +10,43 @@ const categorySelect = document.getElementById("categorySelect");
 const specificSitesDropdown = document.getElementById("specificSitesDropdown");
 const searchResults = document.getElementById("searchResults");
 
-// Load category autocomplete
-fetch('/static/data/categories.json')
-  .then(res => res.json())
-  .then(data => categorySuggestions = data)
-  .catch(err => console.error("❌ Failed to load categories.json:", err));
+const SUGGEST_DEBOUNCE_MS = 120;
+const SUGGEST_LIMIT = 8;
 
-// Autocomplete logic
+// Autocomplete logic (server-side prefix index, see /suggest)
 searchInput.addEventListener("input", function () {
-  const input = this.value.toLowerCase();
+  const input = this.value.trim();
   suggestionBox.innerHTML = "";
   currentFocus = -1;
+  clearTimeout(suggestTimer);
 
   if (!input) return;
 
-  const matched = Object.entries(categorySuggestions)
-    .flatMap(([key, items]) => items.filter(item => item.toLowerCase().includes(input)));
+  suggestTimer = setTimeout(() => fetchSuggestions(input), SUGGEST_DEBOUNCE_MS);
+});
+
+function fetchSuggestions(input) {
+  // Drop any in-flight request so a slow, older answer never overwrites a newer one
+  if (suggestController) suggestController.abort();
+  suggestController = new AbortController();
 
-  const unique = [...new Set(matched)];
+  fetch(`/suggest?q=${encodeURIComponent(input)}&k=${SUGGEST_LIMIT}`, { signal: suggestController.signal })
+    .then(res => res.json())
+    .then(data => {
+      if (searchInput.value.trim() !== input) return;
+      categorySuggestions = data.suggestions || [];
+      renderSuggestions(categorySuggestions);
+    })
+    .catch(err => {
+      if (err.name !== "AbortError") console.error("❌ Failed to load suggestions:", err);
+    });
+}
 
-  unique.forEach(item => {
+function renderSuggestions(items) {
+  suggestionBox.innerHTML = "";
+  currentFocus = -1;
+
+  items.forEach(item => {
     const option = document.createElement("div");
     option.className = "autocomplete-item";
     option.textContent = item;
@@ -37,7 +56,7 @@ searchInput.addEventListener("input", function () {
     };
     suggestionBox.appendChild(option);
   });
-});
+}
 
 searchInput.addEventListener("keydown", function (e) {
   const items = suggestionBox.getElementsByClassName("autocomplete-item");
@@ -119,66 +138,116 @@ function performSearch() {
 
   console.log("🚀 Fetching from:", { query, category, specificSite });
 
+  // Stream results: each site's cards render as soon as that site finishes
+  const seen = new Set();
+  const allProducts = [];
+  let summaryText = "";
+
   fetch("/search-products", {
     method: "POST",
     headers: {
-      "Content-Type": "application/json"
+      "Content-Type": "application/json",
+      "Accept": "application/x-ndjson"
     },
-    body: JSON.stringify({ query, category, specificSite })
+    body: JSON.stringify({ query, category, specificSite, stream: true })
   })
-    .then(res => res.json())
-    .then(data => {
-      if (data.error) {
-        searchResults.innerHTML = `<div class="error">❌ ${data.error}</div>`;
-        return;
+    .then(res => {
+      if (!res.ok) {
+        return res.json().then(data => { throw new Error(data.error || "Error fetching products."); });
       }
+      return readSearchEvents(res, event => {
+        if (event.event === "site") {
+          (event.data || []).forEach(p => {
+            const key = `${p.name}|${p.price}|${p.image}`;
+            if (seen.has(key)) return;
+            seen.add(key);
+            allProducts.push(p);
+          });
+          if (allProducts.length) renderProducts(allProducts, summaryText);
+        } else if (event.event === "ranked" && (event.data || []).length) {
+          // The merged cross-site ranking replaces the per-site blocks shown so far
+          allProducts.length = 0;
+          event.data.forEach(p => allProducts.push(p));
+          renderProducts(allProducts, summaryText);
+        } else if (event.event === "summary_delta") {
+          summaryText += event.text || "";
+          showSummary(summaryText);
+        } else if (event.event === "summary") {
+          summaryText = event.summary || summaryText;
+          showSummary(summaryText);
+        } else if (event.event === "error" && !allProducts.length) {
+          searchResults.innerHTML = `<div class="error">❌ ${event.error}</div>`;
+        } else if (event.event === "done" && !allProducts.length && !searchResults.querySelector(".error")) {
+          searchResults.innerHTML = "<div class='error'>No products found.</div>";
+        }
+      });
+    })
+    .catch(err => {
+      console.error("Fetch error:", err);
+      searchResults.innerHTML = `<div class='error'>❌ ${err.message || "Error fetching products."}</div>`;
+    });
+}
 
-      const allProducts = data.products.flatMap(site => site.data || []);
+// Read an NDJSON response body line by line, calling onEvent for every parsed event
+async function readSearchEvents(res, onEvent) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
 
-      if (!allProducts.length) {
-        searchResults.innerHTML = "<div class='error'>No products found.</div>";
-        return;
-      }
+  while (true) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
 
-      const seen = new Set();
-      const uniqueProducts = allProducts.filter(p => {
-        const key = `${p.name}|${p.price}|${p.image}`;
-        if (seen.has(key)) return false;
-        seen.add(key);
-        return true;
-      });
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) onEvent(JSON.parse(line));
+    }
+
+    if (done) break;
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
 
-      const cards = uniqueProducts.map(p => {
-        const siteClass = p.source?.toLowerCase() || "";
-        return `
-          <div class="col-md-6 col-lg-4 mb-4">
-            <div class="card h-100 ${siteClass}">
-              <img src="${p.image}" class="card-img-top" alt="${p.name}">
-              <div class="card-body">
-                <h5 class="card-title">${p.name}</h5>
-                <p class="card-text">Price: ${p.price}</p>
-                ${p.rating !== undefined ? `<p class="card-text">Rating: ${p.rating} ⭐</p>` : ""}
-                <p class="card-text"><strong>Source:</strong> ${capitalize(p.source)}</p>
-                <div class="d-flex justify-content-between align-items-center gap-2 mt-3">
-                  <a href="${p.url}" class="btn btn-primary" target="_blank">Buy Now</a>
-                  <button class="btn btn-danger btn-sm clear-btn" onclick="clearSearch()">Clear</button>
-                </div>
-              </div>
+function renderProducts(products, summary) {
+  const cards = products.map(p => {
+    const siteClass = p.source?.toLowerCase() || "";
+    return `
+      <div class="col-md-6 col-lg-4 mb-4">
+        <div class="card h-100 ${siteClass}">
+          <img src="${p.image}" class="card-img-top" alt="${p.name}">
+          <div class="card-body">
+            <h5 class="card-title">${p.name}</h5>
+            <p class="card-text">Price: ${p.price}</p>
+            ${p.rating !== undefined ? `<p class="card-text">Rating: ${p.rating} ⭐</p>` : ""}
+            <p class="card-text"><strong>Source:</strong> ${capitalize(p.source)}</p>
+            <div class="d-flex justify-content-between align-items-center gap-2 mt-3">
+              <a href="${p.url}" class="btn btn-primary" target="_blank">Buy Now</a>
+              <button class="btn btn-danger btn-sm clear-btn" onclick="clearSearch()">Clear</button>
             </div>
           </div>
-        `;
-      }).join("");
-
-      searchResults.innerHTML = `
-        <div class="container">
-          <div class="row">${cards}</div>
         </div>
-      `;
-    })
-    .catch(err => {
-      console.error("Fetch error:", err);
-      searchResults.innerHTML = "<div class='error'>Error fetching products.</div>";
-    });
+      </div>
+    `;
+  }).join("");
+
+  searchResults.innerHTML = `
+    <div class="container">
+      <div class="row">${cards}</div>
+      <div class="search-summary hidden"></div>
+    </div>
+  `;
+
+  showSummary(summary);
+}
+
+// Fill the summary box in place so streamed tokens don't re-render the cards
+function showSummary(summary) {
+  const summaryBox = searchResults.querySelector(".search-summary");
+  if (!summaryBox || !summary) return;
+  summaryBox.textContent = summary;
+  summaryBox.classList.remove("hidden");
 }
 
 function clearSearch() {
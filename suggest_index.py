@@ -0,0 +1,137 @@
+# suggest_index.py
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+TOKEN_SPLIT = re.compile(r"\s+")
+
+
+class SuggestIndex:
+    """
+    In-memory prefix index over the product names in categories.json.
+
+    Every name is indexed once per word start ("hp pavilion 15", "pavilion 15",
+    "15"), kept in one sorted list and searched with bisect, so a lookup costs
+    O(log n + matches) and the response size is bounded by k, not the catalog.
+    When the file changes on disk (another worker's or this one's category flush),
+    the index is rebuilt on a background thread while the old one keeps answering.
+    """
+
+    MAX_SCAN = 2000  # Upper bound on candidates ranked for very short prefixes
+    RELOAD_CHECK_SECONDS = 30  # How often to look for writes by other workers
+
+    def __init__(self, path):
+        self.path = path
+        self._keys = []  # Sorted (key, word_offset, display)
+        self._names = set()  # Case-folded names already indexed
+        self._added = []  # Names add()ed since the last load() swap, which the file may not have yet
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self._last_check = 0.0
+        self._reloading = False
+
+    def load(self):
+        """(Re)build the index from the categories file."""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                categories = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not load suggestions from {self.path}: {e}")
+            return
+
+        keys = []
+        names = set()
+        for items in categories.values():
+            for name in items:
+                folded = name.casefold()
+                if folded in names:
+                    continue
+                names.add(folded)
+                keys.extend(self._keys_for(name))
+        keys.sort()
+
+        with self._lock:
+            # Names added while this rebuild ran (or not yet flushed to the file) would be lost in the swap
+            for name in self._added:
+                folded = name.casefold()
+                if folded not in names:
+                    names.add(folded)
+                    for key in self._keys_for(name):
+                        insort(keys, key)
+            self._added = []
+            self._keys = keys
+            self._names = names
+            self._loaded_mtime = mtime
+            self._last_check = time.monotonic()
+        print(f"[SUGGEST] Indexed {len(names)} names ({len(keys)} prefixes)")
+
+    def add(self, name):
+        """Index a newly stored product name without rebuilding."""
+        self._ensure_fresh()
+        folded = name.casefold()
+        with self._lock:
+            if folded in self._names:
+                return
+            self._names.add(folded)
+            self._added.append(name)
+            for key in self._keys_for(name):
+                insort(self._keys, key)
+
+    def suggest(self, query, k=8):
+        """Top-k names with a word starting with `query`; whole-name prefix matches and shorter names rank first."""
+        prefix = " ".join(TOKEN_SPLIT.split(query.strip())).casefold()
+        if not prefix:
+            return []
+
+        self._ensure_fresh()
+        with self._lock:
+            keys = self._keys
+            start = bisect_left(keys, (prefix,))
+            candidates = {}
+            for i in range(start, min(start + self.MAX_SCAN, len(keys))):
+                key, offset, display = keys[i]
+                if not key.startswith(prefix):
+                    break
+                best = candidates.get(display)
+                if best is None or offset < best:
+                    candidates[display] = offset
+
+        ranked = sorted(candidates.items(), key=lambda item: (item[1] > 0, len(item[0]), item[0].casefold()))
+        return [display for display, _ in ranked[:k]]
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._loaded_mtime is not None and now - self._last_check < self.RELOAD_CHECK_SECONDS:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        if self._loaded_mtime is None:
+            self.load()  # Nothing to serve yet
+            return
+
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="suggest-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.load()
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    @staticmethod
+    def _keys_for(name):
+        tokens = TOKEN_SPLIT.split(name.strip().casefold())
+        return [(" ".join(tokens[i:]), i, name) for i in range(len(tokens)) if tokens[i]]
@@ -1,26 +1,14 @@
 # trigger.py
+from query_classifier import classify
 
-RATING_SITES = ["jumia", "amazon"]
-
-# Restrict fetch phrases to rating sites only, and explicitly structured fetch intents
-FETCH_PHRASES = {
-    "jumia": ["fetch from jumia", "get it from jumia", "search from jumia"],
-    "amazon": ["fetch from amazon", "get it from amazon", "search from amazon"]
-}
+# Fetch phrases (FETCH_PHRASES) are restricted to rating sites and compiled in query_classifier.py
 
 def detect_fetch_trigger(user_input):
     """
     Detects if user input contains a valid and explicit fetch trigger
     for a rating-supported site only.
     """
-    user_input = user_input.lower().strip()
-    
-    for site in RATING_SITES:
-        phrases = FETCH_PHRASES.get(site, [])
-        if any(p in user_input for p in phrases):
-            return site
-    
-    return None
+    return classify(user_input).fetch_site
 
 
 def generate_fetch_response(site, product_name, last_suggested=None):
@@ -0,0 +1,46 @@
+# utils.py
+# 🧰 Helpers shared by the modules that keep state on disk for every worker on the host
+# (category_store, provider_budget) and by the env-var config blocks.
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; elsewhere state is only consistent within one process
+except ImportError:
+    fcntl = None
+
+
+def env_number(name, default, cast=float):
+    """Numeric env var, or default when it is unset or empty."""
+    value = os.getenv(name)
+    return cast(value) if value else default
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write data as JSON to a temp file and rename it over path, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive cross-process lock on path + ".lock" (a no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)